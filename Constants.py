@@ -36,5 +36,51 @@ COLORS = {
     'text': (0, 0, 0),
     'table_border': (100, 100, 100),
     'arrow_border': (150, 150, 150),
+    'heat_route': (0, 160, 255),
+    'heat_off_route': (255, 40, 40),
 }
-FRAME_RATE = 60
\ No newline at end of file
+FRAME_RATE = 60
+
+# ------FOR PROFILING ONLY------
+PROFILER_ENABLED = False  # record per-phase frame timings (press P to toggle the overlay)
+PROFILER_HISTORY = 600  # number of frames kept in each phase histogram
+PROFILER_EXPORT_FILE = "./profiler_samples.csv"  # samples are written here on exit
+# -------------------------------
+
+# ------VIEWPORT------
+MAX_VIEW_WIDTH = 960  # the maze area never grows beyond this, larger mazes scroll
+MAX_VIEW_HEIGHT = 640
+TILE_CELLS = 8  # cells per tile side at zoom 1
+TILE_CACHE_SIZE = 96  # number of pre-rasterised tiles kept in the LRU cache
+ZOOM_LEVELS = (1/32, 1/16, 1/8, 1/4, 1/2, 1, 2)
+LOD_MIN_CELL_PIXELS = 6  # below this cell size tiles are drawn as a coarse wall-density image
+TRAIL_CHUNK_POINTS = 64  # trail points per bounding box used to cull the trail to the view
+
+# ------HAPTIC FEEDBACK------
+HAPTIC_DEVICE_ADDRESS = ('localhost', 65433)  # address of the vibration device bridge
+HAPTIC_ACK_TIMEOUT = 0.2  # seconds to wait for the device to acknowledge a command
+HAPTIC_COALESCE_MS = 500  # repeated alerts for the same turn within this window are dropped
+HAPTIC_HISTORY = 1000  # number of latency records kept
+MAX_SAMPLES_PER_STEP = 32  # real IMU datagrams processed per frame (each one is checked for turns)
+
+# ------PATH PLANNING------
+HPA_CLUSTER_SIZE = 10  # cluster side (cells) of the hierarchical planner's abstract graph
+
+# ------FRAME EXPORT------
+EXPORT_FPS = 20  # frames per second of virtual time rendered by main.py --export
+EXPORT_QUEUE_SIZE = 32  # frames waiting for the encoder thread before rendering blocks
+EXPORT_TAIL_MS = 2000  # keep rendering after the last IMU sample so the final alert is visible
+
+# ------CORE PROCESS------
+SEPARATE_CORE_PROCESS = False  # run IMU ingestion and turn checks in a child process (main.py --core-process)
+STATE_RING_SLOTS = 256  # shared-memory state records kept for the renderer
+
+# ------OCCUPANCY HEATMAP------
+HEATMAP_ENABLED = False  # show the overlay at start (toggle with H) and archive the counts on exit
+HEATMAP_BINS_PER_CELL = 2  # heatmap resolution along each cell side
+HEATMAP_HALF_LIFE_MS = 60000  # overlay density halves after this long without visits (0 = no decay)
+HEATMAP_ALPHA = 160  # opacity of the most visited bin
+
+# ------CHECKPOINTS------
+CHECKPOINT_INTERVAL_MS = 2000  # virtual time between simulation snapshots (seeking fast-forwards at most this far)
+SEEK_STEP_MS = 5000  # jump of the [ and ] keys
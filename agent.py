@@ -1,14 +1,16 @@
-import pygame
 from math import cos, sin, pi
 from Constants import *
+from config import SimulationConfig
 
 
 class Agent:
     """Mobile agent with IMU-based navigation"""
-    def __init__(self):
+    def __init__(self, config=None):
+        self.config = config or SimulationConfig()
         self.trail = []
+        self.trail_chunks = []  # [min x, min y, max x, max y] of every TRAIL_CHUNK_POINTS trail points
         # self.current_pos = None
-        self.current_pos = (20, 20)
+        self.current_pos = (self.config.cell_size/2, self.config.cell_size/2)
         self.current_heading = 0
         self.last_valid_data = None
     
@@ -23,22 +25,69 @@ class Agent:
             self.current_pos = (self.last_valid_data[0], self.last_valid_data[1])
             self.current_heading = self.last_valid_data[2]
         
-        if self.current_pos:
-            self.trail.append(self.current_pos)
+        # Frames without a new sample repeat the last point, which would only grow the trail
+        if self.current_pos and (not self.trail or self.trail[-1] != self.current_pos):
+            self._append_trail(self.current_pos)
+
+    def _append_trail(self, pos):
+        if len(self.trail) % TRAIL_CHUNK_POINTS == 0:
+            self.trail_chunks.append([pos[0], pos[1], pos[0], pos[1]])
+        else:
+            box = self.trail_chunks[-1]
+            box[0], box[1] = min(box[0], pos[0]), min(box[1], pos[1])
+            box[2], box[3] = max(box[2], pos[0]), max(box[3], pos[1])
+        self.trail.append(pos)
+
+    def set_trail(self, points):
+        """Replace the trail (e.g. when restoring a checkpoint) and rebuild its chunk boxes"""
+        self.trail = []
+        self.trail_chunks = []
+        for pos in points:
+            self._append_trail(tuple(pos))
+
+    def _visible_trail(self, camera):
+        """Trail polylines through the chunks that overlap the view, thinned out when zoomed out"""
+        x, y, w, h = camera.visible_rect()
+        step = max(1, int(1 / camera.zoom))  # about one point per screen pixel of spacing
+        runs = []
+        run = None
+        for i, (x0, y0, x1, y1) in enumerate(self.trail_chunks):
+            if x1 < x or x0 > x + w or y1 < y or y0 > y + h:
+                run = None
+                continue
+            start = i * TRAIL_CHUNK_POINTS
+            end = min(start + TRAIL_CHUNK_POINTS, len(self.trail))
+            points = self.trail[start:end:step]
+            if points[-1] != self.trail[end - 1]:
+                points.append(self.trail[end - 1])
+            if run is None:
+                # Start at the previous chunk's last point so neighbouring chunks stay connected
+                run = [self.trail[start - 1]] if start else []
+                runs.append(run)
+            run.extend(points)
+        return runs
     
-    def draw(self, surface):
-        """Render agent and trail"""
-        if len(self.trail) >= 2:
-            pygame.draw.lines(surface, COLORS['trail'], False, self.trail, 3)
+    def draw(self, surface, camera=None):
+        """Render agent and trail (through the camera when one is given)"""
+        import pygame
+        to_screen = camera.world_to_screen if camera else (lambda pos: pos)
+        zoom = camera.zoom if camera else 1
+        runs = self._visible_trail(camera) if camera else [self.trail]
+        for run in runs:
+            if len(run) >= 2:
+                pygame.draw.lines(surface, COLORS['trail'], False, [to_screen(p) for p in run],
+                                  max(1, int(round(3 * zoom))))
             
         if self.current_pos:
             angle = self.current_heading
-            front = (CELL_SIZE/2 * cos(angle), CELL_SIZE/2 * sin(angle))
-            left = (CELL_SIZE/4 * cos(angle + pi/2), CELL_SIZE/4 * sin(angle + pi/2))
-            right = (CELL_SIZE/4 * cos(angle - pi/2), CELL_SIZE/4 * sin(angle - pi/2))
+            cell_size = self.config.cell_size * zoom
+            x, y = to_screen(self.current_pos)
+            front = (cell_size/2 * cos(angle), cell_size/2 * sin(angle))
+            left = (cell_size/4 * cos(angle + pi/2), cell_size/4 * sin(angle + pi/2))
+            right = (cell_size/4 * cos(angle - pi/2), cell_size/4 * sin(angle - pi/2))
             points = [
-                (self.current_pos[0] + front[0], self.current_pos[1] + front[1]),
-                (self.current_pos[0] - front[0]/2 + left[0], self.current_pos[1] - front[1]/2 + left[1]),
-                (self.current_pos[0] - front[0]/2 + right[0], self.current_pos[1] - front[1]/2 + right[1])
+                (x + front[0], y + front[1]),
+                (x - front[0]/2 + left[0], y - front[1]/2 + left[1]),
+                (x - front[0]/2 + right[0], y - front[1]/2 + right[1])
             ]
             pygame.draw.polygon(surface, COLORS['agent'], points)
\ No newline at end of file
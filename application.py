@@ -1,105 +1,151 @@
 # ------ HCARD Group 1 ------
+import os
 import pygame
-from maze import MazeGenerator
-from pathfinder import PathFinder
-from imu import IMUSimulator
-from agent import Agent
-from math import atan2, degrees, sqrt, pi
+from simulation import Simulation
+from config import SimulationConfig
+from profiler import FrameProfiler
+from camera import Camera, TileCache, SpatialIndex
+from haptics import HapticDispatcher
+from heatmap import OccupancyHeatmap
+from maze import TURN_NAMES
+from math import degrees
 from Constants import *
 
 
 class MainApplication:
     """Main application controller"""
-    def __init__(self):
+    def __init__(self, config=None, core_process=SEPARATE_CORE_PROCESS):
+        self.config = config or SimulationConfig()
+        self.sim = Simulation(self.config)
+        self.maze = self.sim.maze
+        self.pathfinder = self.sim.pathfinder
+        self.imu = self.sim.imu
+        self.agent = self.sim.agent
+        self.turn_points = self.sim.turn_points
+        self.sim.alert_listeners.append(self._on_turn_alert)
+
+        # Window size follows the loaded maze, capped so huge mazes scroll inside a viewport
+        cell_size = self.config.cell_size
+        self.maze_width_px = cell_size * self.maze.width
+        self.maze_height_px = cell_size * self.maze.height
+        self.view_width = min(self.maze_width_px, MAX_VIEW_WIDTH)
+        self.view_height = min(self.maze_height_px, MAX_VIEW_HEIGHT)
+        self.window_width = self.view_width
+        self.window_height = self.view_height + INFO_PANEL_HEIGHT
+        self.camera = Camera(self.view_width, self.view_height, self.maze_width_px, self.maze_height_px)
+        self.tiles = TileCache(self.maze, cell_size)
+        # Path segments and turn markers bucketed by tile, so drawing only visits what is on screen
+        self.segment_index = SpatialIndex(TILE_CELLS * cell_size)
+        self.segment_lines = []
+        for i, segment in enumerate(self.pathfinder.segments):
+            (r0, c0), (r1, c1) = self.pathfinder.path[segment["start"]], self.pathfinder.path[segment["end"]]
+            start = (cell_size*(c0+0.5), cell_size*(r0+0.5))
+            end = (cell_size*(c1+0.5), cell_size*(r1+0.5))
+            self.segment_lines.append((start, end))
+            self.segment_index.insert(i, (min(start[0], end[0]), min(start[1], end[1]),
+                                          max(start[0], end[0]), max(start[1], end[1])))
+        self.turn_index = SpatialIndex(TILE_CELLS * cell_size)
+        for i, turn in enumerate(self.turn_points):
+            x, y = turn["screen_pos"]
+            self.turn_index.insert(i, (x, y, x, y))
+        self.marker_font = None  # created with the first frame, after pygame.init()
+
         pygame.init()
         pygame.display.set_caption("Maze Navigation System with Vibration Feedback")
-        icon = pygame.image.load("./IMGS/icon.png")
+        icon = pygame.image.load("./IMGS/ICON.png")
         pygame.display.set_icon(icon)
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.screen = pygame.display.set_mode((self.window_width, self.window_height))
         self.clock = pygame.time.Clock()
-        self.maze = MazeGenerator()
-        self.pathfinder = PathFinder(self.maze)
-        self.imu = IMUSimulator(self.pathfinder.path)
-        self.agent = Agent()
         self.processed_turns = set()
         self.show_path = True
         self.running = True
-        self.next_turn_index = 0  # Index of next turn point to check
-        self.turn_points = self.pathfinder.turn_points
-        self.alert_distance = 25  # Advance notification distance (pixels, need to be adjusted in real world).
-        self.direction_alingnment = 40
-        self.turn_points = self.pathfinder.turn_points
         self.show_turn_points = True
-        self.current_turn_alert = None
-        self.turn_alert_start_time = 0
+        self.haptics = None  # created on the first vibration command
+        self.profiler = FrameProfiler()
+        self.sim.sample_listeners.append(lambda imu_data: self.profiler.imu_sample())
+        self.heatmap = OccupancyHeatmap(self.maze, cell_size, self.pathfinder.path)
+        self.sim.sample_listeners.append(self.heatmap.add)
+        # Optional child process that owns ingestion and turn checks, self.sim then only mirrors its state
+        self.core = None
+        self.core_sample_count = 0
+        self.core_alert_count = 0
+        if core_process:
+            from core_process import CoreProcess
+            self.core = CoreProcess(self.config)
+        # Checkpoints of the simulated run so [ and ] can seek; sim time = ticks + time_offset
+        self.timeline = None
+        self.time_offset = 0
+        if SIMULATION_MODE and self.core is None:
+            from checkpoints import SimulationTimeline
+            self.timeline = SimulationTimeline(self.sim, extras={"heatmap": self.heatmap})
 
     def _draw_maze(self):
-        """Render maze structure"""
-        for row in range(MAZE_HEIGHT):
-            for col in range(MAZE_WIDTH):
-                x = col * CELL_SIZE
-                y = row * CELL_SIZE
-                if self.maze.grid[row][col]['top']:
-                    pygame.draw.line(self.screen, COLORS['wall'], (x, y), (x+CELL_SIZE, y), 3)
-                if self.maze.grid[row][col]['left']:
-                    pygame.draw.line(self.screen, COLORS['wall'], (x, y), (x, y+CELL_SIZE), 3)
+        """Render the tiles of the maze that fall inside the viewport"""
+        self.tiles.draw(self.screen, self.camera)
         
-        # Draw start and end markers
-        pygame.draw.circle(self.screen, COLORS['start'], 
-                          (int(CELL_SIZE*0.5), int(CELL_SIZE*0.5)), 8)
-        pygame.draw.circle(self.screen, COLORS['end'], 
-                          (int(CELL_SIZE*(MAZE_WIDTH-0.5)), int(CELL_SIZE*(MAZE_HEIGHT-0.5))), 8)
+        # Draw start and end markers at the maze's own start/end cells
+        cell_size = self.config.cell_size
+        for cell, color in ((self.maze.start, COLORS['start']), (self.maze.end, COLORS['end'])):
+            pos = (cell_size*(cell[1]+0.5), cell_size*(cell[0]+0.5))
+            if self.camera.is_visible(pos, cell_size):
+                x, y = self.camera.world_to_screen(pos)
+                pygame.draw.circle(self.screen, color, (int(x), int(y)), 8)
 
     def _draw_path(self):
-        """Render planned path"""
-        if len(self.pathfinder.path) >= 2:
-            points = [(CELL_SIZE*(c+0.5), CELL_SIZE*(r+0.5)) for (r, c) in self.pathfinder.path]
-            pygame.draw.lines(self.screen, COLORS['path'], False, points, 5)
+        """Render planned path, one line per straight segment inside the viewport"""
+        width = max(1, int(round(5 * self.camera.zoom)))
+        for i in self.segment_index.query(self.camera.visible_rect()):
+            start, end = self.segment_lines[i]
+            pygame.draw.line(self.screen, COLORS['path'],
+                             self.camera.world_to_screen(start), self.camera.world_to_screen(end), width)
 
     def _draw_turn_markers(self):
         """Draw turn markers on the screen"""
         if not self.show_turn_points:
             return
         
-        for turn in self.turn_points:
-            x, y = turn["screen_pos"]
+        if self.marker_font is None:
+            self.marker_font = pygame.font.SysFont('Arial', 14)
+        font = self.marker_font
+        radius = max(2, int(round(6 * min(self.camera.zoom, 1))))
+        show_labels = self.camera.zoom >= 0.5  # labels only clutter the view when zoomed out
+        x0, y0, w, h = self.camera.visible_rect()
+        margin = self.config.cell_size
+        for i in self.turn_index.query((x0 - margin, y0 - margin, w + 2 * margin, h + 2 * margin)):
+            turn = self.turn_points[i]
+            x, y = self.camera.world_to_screen(turn["screen_pos"])
             direction = turn["direction"]
             color = COLORS['turn_right'] if direction == "Right" else COLORS['turn_left']
             # Draw circular marker
-            pygame.draw.circle(self.screen, color, (int(x), int(y)), 6)
+            pygame.draw.circle(self.screen, color, (int(x), int(y)), radius)
             # Add direction text label
-            font = pygame.font.SysFont('Arial', 14)
-            text = font.render(direction, True, color)
-            self.screen.blit(text, (x + 8, y))
-
-    def send_vibration_command(self, direction):
-        '''send vibration command to the device via Bluetooth'''
-        # ......
-
-
-
+            if show_labels:
+                text = font.render(direction, True, color)
+                self.screen.blit(text, (x + 8, y))
 
+    def send_vibration_command(self, direction, turn=None):
+        '''send vibration command to the device (queued, the worker thread does the actual write)'''
+        if self.haptics is None:
+            self.haptics = HapticDispatcher()
+        self.haptics.submit(direction, self.sim.last_sample_time, turn)
 
-
-
-        pass
-
-    def _draw_info_panel(self):
+    def _draw_info_panel(self, current_time):
         """Draw info panel"""
-        panel_y = CELL_SIZE * MAZE_HEIGHT
+        panel_y = self.view_height
+        window_width = self.window_width
         font = pygame.font.SysFont('Arial', 24)
         
         # Draw panel background
         pygame.draw.rect(self.screen, COLORS['info_panel_bg'],
-                    (0, panel_y, WINDOW_WIDTH, INFO_PANEL_HEIGHT))
+                    (0, panel_y, window_width, INFO_PANEL_HEIGHT))
 
         # ===== Table section =====
         # Draw table border
-        table_rect = pygame.Rect(20, panel_y + 10, WINDOW_WIDTH-40, 80)
+        table_rect = pygame.Rect(20, panel_y + 10, window_width-40, 80)
         pygame.draw.rect(self.screen, COLORS['table_border'], table_rect, 2)
 
         # Draw column divider
-        col_x = WINDOW_WIDTH//2
+        col_x = window_width//2
         pygame.draw.line(self.screen, COLORS['table_border'],
                     (col_x, panel_y+10), (col_x, panel_y+90), 2)
 
@@ -138,10 +184,11 @@ class MainApplication:
         ]
 
         # Determine fill colors (keep original logic)
-        left_color = COLORS['turn_left'] if (self.current_turn_alert and 
-                                        self.current_turn_alert["direction"] == "Left") else None
-        right_color = COLORS['turn_right'] if (self.current_turn_alert and 
-                                        self.current_turn_alert["direction"] == "Right") else None
+        current_turn_alert = self.sim.expire_alert(current_time)
+        left_color = COLORS['turn_left'] if (current_turn_alert and 
+                                        current_turn_alert["direction"] == "Left") else None
+        right_color = COLORS['turn_right'] if (current_turn_alert and 
+                                        current_turn_alert["direction"] == "Right") else None
 
         # Draw left arrow (fill first then outline)
         if left_color:
@@ -154,49 +201,21 @@ class MainApplication:
         pygame.draw.polygon(self.screen, COLORS['arrow_border'], right_arrow, 2)
 
         # ===== Text alert section =====
-        if self.current_turn_alert:
-            current_time = pygame.time.get_ticks()
-            elapsed = current_time - self.turn_alert_start_time
-            
-            if elapsed <= 2000:
-                direction = self.current_turn_alert["direction"]
-                distance = self.current_turn_alert["distance"]
-                color = COLORS['turn_right'] if direction == "Right" else COLORS['turn_left']
-                alert_text = f"Turn {direction} in {distance:.1f} units!"
-                alert_surface = font.render(alert_text, True, color)
-                self.screen.blit(alert_surface, (col_x - alert_surface.get_width()//2, arrow_y + ARROW_SIZE + 10))
-            else:
-                self.current_turn_alert = None
+        if current_turn_alert:
+            direction = current_turn_alert["direction"]
+            distance = current_turn_alert["distance"]
+            color = COLORS['turn_right'] if direction == "Right" else COLORS['turn_left']
+            alert_text = f"Turn {direction} in {distance:.1f} units!"
+            alert_surface = font.render(alert_text, True, color)
+            self.screen.blit(alert_surface, (col_x - alert_surface.get_width()//2, arrow_y + ARROW_SIZE + 10))
 
-    def _check_upcoming_turn(self):
-        """Check proximity to next turn point"""
-        if self.next_turn_index >= len(self.turn_points):
-            return
-        
-        turn_info = self.turn_points[self.next_turn_index]
-        turn_x, turn_y = turn_info["screen_pos"]
-        required_direction = turn_info["direction"]
-        
-        agent_x, agent_y = self.agent.current_pos
-        dx = turn_x - agent_x
-        dy = turn_y - agent_y
-        distance = sqrt(dx**2 + dy**2)
-        
-        if distance <= self.alert_distance:
-            path_angle = atan2(dy, dx)
-            agent_angle = self.agent.current_heading
-            angle_diff = degrees((path_angle - agent_angle + pi) % (2*pi) - pi)
-            
-            if abs(angle_diff) < self.direction_alingnment:  # Direction alignment threshold
-                print(f"Turn {required_direction} {distance:.1f} units ahead!")
-                self.current_turn_alert = {
-                    "direction": required_direction,
-                    "distance": distance
-                }
-                self.turn_alert_start_time = pygame.time.get_ticks()
-                if not SIMULATION_MODE:
-                    self.send_vibration_command(required_direction)  # Send vibration command (only used in real environment)
-                self.next_turn_index += 1
+    def _on_turn_alert(self, direction, distance):
+        """Called by the simulation core whenever a turn alert fires"""
+        print(f"Turn {direction} {distance:.1f} units ahead!")
+        self.profiler.alert_fired()
+        if not SIMULATION_MODE and self.core is None:  # the core process sends its own commands
+            # Send vibration command (only used in real environment)
+            self.send_vibration_command(direction, self.sim.current_turn_alert["turn"])
 
     def _draw_path_points(self):
         """Draw path points as individual markers"""
@@ -208,8 +227,11 @@ class MainApplication:
             point_radius = 4 
             
             for (row, col) in self.pathfinder.path:
-                x = col * CELL_SIZE + CELL_SIZE // 2
-                y = row * CELL_SIZE + CELL_SIZE // 2
+                pos = (col * self.config.cell_size + self.config.cell_size // 2,
+                       row * self.config.cell_size + self.config.cell_size // 2)
+                if not self.camera.is_visible(pos, point_radius):
+                    continue
+                x, y = self.camera.world_to_screen(pos)
                 
                 pygame.draw.circle(
                     self.screen,
@@ -218,10 +240,117 @@ class MainApplication:
                     point_radius
                 )
 
+    def _handle_camera_key(self, key):
+        """Arrow keys pan, +/- zoom, F re-enables following the agent"""
+        step = 40
+        if key == pygame.K_LEFT:
+            self.camera.pan(-step, 0)
+        elif key == pygame.K_RIGHT:
+            self.camera.pan(step, 0)
+        elif key == pygame.K_UP:
+            self.camera.pan(0, -step)
+        elif key == pygame.K_DOWN:
+            self.camera.pan(0, step)
+        elif key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+            self.camera.zoom_by(1)
+        elif key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.camera.zoom_by(-1)
+        elif key == pygame.K_f:
+            self.camera.follow = True
+        elif key == pygame.K_LEFTBRACKET:
+            self._seek(-SEEK_STEP_MS)
+        elif key == pygame.K_RIGHTBRACKET:
+            self._seek(SEEK_STEP_MS)
+
+    def _seek(self, delta):
+        """Jump the simulated run by delta ms (nearest checkpoint + fast-forward)"""
+        if self.timeline is None:
+            return
+        now = pygame.time.get_ticks()
+        target = max(0, now + self.time_offset + delta)
+        self.timeline.seek(target)
+        self.time_offset = target - now
+
+    def _apply_core_state(self, current_time):
+        """Replay the records published by the core process since the last frame"""
+        for state in self.core.poll():
+            if state['sample_count'] > self.core_sample_count:
+                self.core_sample_count = int(state['sample_count'])
+                sample = (state['x'], state['y'], state['heading'])
+                self.sim.last_sample = sample
+                for listener in self.sim.sample_listeners:
+                    listener(sample)
+                self.agent.update(sample)
+            self.sim.next_turn_index = int(state['next_turn_index'])
+            if state['alert_count'] > self.core_alert_count:
+                self.core_alert_count = int(state['alert_count'])
+                self.sim.announce_alert(TURN_NAMES[int(state['alert_direction'])],
+                                        state['alert_distance'], current_time)
+
+    def _render(self, current_time):
+        """Draw one frame into self.screen (maze layers are clipped to the viewport above the info panel)"""
+        profiler = self.profiler
+        if self.camera.follow:
+            self.camera.center_on(self.agent.current_pos)
+        self.screen.fill(COLORS['background'])
+        self.screen.set_clip(pygame.Rect(0, 0, self.view_width, self.view_height))
+        self._draw_maze()
+        self.heatmap.update(current_time)
+        self.heatmap.draw(self.screen, self.camera)
+        profiler.lap('maze')
+        if self.show_turn_points:
+            self._draw_turn_markers()
+        profiler.lap('markers')
+        if self.show_path:
+            self._draw_path()
+        profiler.lap('path')
+        self.agent.draw(self.screen, self.camera)
+        if DEBUG_MODE:
+            self._draw_path_points()
+        self.screen.set_clip(None)
+        profiler.lap('agent')
+        self._draw_info_panel(current_time)
+        profiler.draw_overlay(self.screen, pygame.Rect(0, self.view_height, self.window_width, INFO_PANEL_HEIGHT))
+        profiler.lap('panel')
+
+    def export(self, path, fps=EXPORT_FPS):
+        """Render the whole simulation off-screen on a virtual clock and write it to path (see frame_export.py)
+
+        Returns False if the encoder failed (close() already reported why).
+        """
+        from frame_export import FrameExporter
+        exporter = FrameExporter(path, (self.window_width, self.window_height), fps)
+        frame_ms = 1000 / fps
+        current_time = 0
+        end_time = None
+        while end_time is None or current_time <= end_time:
+            self.sim.step(current_time)
+            self._render(current_time)
+            exporter.submit(self.screen)
+            if end_time is None and self.sim.finished:
+                end_time = current_time + EXPORT_TAIL_MS
+            current_time += frame_ms
+        exporter.close()
+        pygame.quit()
+        if exporter.error is not None:
+            return False
+        print(f"Exported {exporter.frame_count} frames ({exporter.encoded_count} changed) to {path}, "
+              f"rendering waited {exporter.wait_time * 1000:.0f} ms for the encoder")
+        return True
+
+    def _export_heatmap(self):
+        """Add this session's visit counts to <maze>.heatmap.npz next to the maze file"""
+        from route_artifacts import maze_file_hash
+        path = os.path.splitext(self.config.maze_file)[0] + ".heatmap.npz"
+        sessions = self.heatmap.export(path, maze_file_hash(self.config.maze_file, self.heatmap.bins_per_cell))
+        print(f"Heatmap saved to {path} ({sessions} sessions, "
+              f"{self.heatmap.off_route_fraction():.0%} of this session's samples off the route)")
+
     def run(self):
         """Main application loop"""
+        profiler = self.profiler
         while self.running:
-            current_time = pygame.time.get_ticks()
+            profiler.start_frame()
             
             # Event handling
             for event in pygame.event.get():
@@ -231,35 +360,49 @@ class MainApplication:
                     self.show_path = not self.show_path
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_BACKSPACE:
                     self.show_turn_points = not self.show_turn_points
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                    profiler.toggle()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                    self.heatmap.show_overlay = not self.heatmap.show_overlay
+                if event.type == pygame.KEYDOWN:
+                    self._handle_camera_key(event.key)
+                if event.type == pygame.MOUSEWHEEL:
+                    self.camera.zoom_by(event.y, pygame.mouse.get_pos())
+            profiler.lap('events')
+            # After the events, so a seek ([ / ]) this frame already moved the clock
+            current_time = pygame.time.get_ticks() + self.time_offset
             
-            # IMU data handling
-            if SIMULATION_MODE:  # If in real environment, use get_real_imu_data()
-                imu_data = self.imu.get_simulated_imu(current_time)
+            # IMU data handling and turns detection (simulated unless in real environment)
+            if self.core is not None:
+                self._apply_core_state(current_time)
             else:
-                imu_data = self.imu.get_real_imu_data()
-            self.agent.update(imu_data)
+                self.sim.step(current_time, simulated=SIMULATION_MODE)
+                if self.timeline is not None:
+                    self.timeline.record(current_time)
             
             if DEBUG_MODE:
                 # print received UDP rawdata
                 self.imu._print_UDP_raw_data()
-
-            # Turns detection
-            self._check_upcoming_turn()
+            profiler.lap('core')
             
-            # Rendering
-            self.screen.fill(COLORS['background'])
-            self._draw_maze()
-            if self.show_turn_points:
-                self._draw_turn_markers()
-            if self.show_path:
-                self._draw_path()
-            self.agent.draw(self.screen)
-            self._draw_info_panel()
-
-            if DEBUG_MODE:
-                self._draw_path_points()
+            self._render(current_time)
 
             pygame.display.flip()
+            profiler.lap('flip')
             self.clock.tick(FRAME_RATE)
+            profiler.lap('tick')
+            profiler.end_frame()
         
+        if self.core is not None:
+            if self.core.ring.dropped:
+                print(f"Renderer skipped {self.core.ring.dropped} core state records")
+            self.core.close()
+        if profiler.frame_count:
+            profiler.export()
+        if HEATMAP_ENABLED:
+            self._export_heatmap()
+        if self.haptics is not None:
+            for stage, (mean, worst) in self.haptics.latency_stats().items():
+                print(f"Haptic {stage}: mean {mean:.2f} ms, max {worst:.2f} ms")
+            self.haptics.close()
         pygame.quit()
@@ -0,0 +1,61 @@
+# ------ HCARD Group 1 ------
+import argparse
+from config import SimulationConfig
+from simulation import Simulation
+from Constants import *
+
+
+class BatchSimulator:
+    """Holds many independent simulations in one process and steps them on a shared virtual clock"""
+    def __init__(self, configs):
+        self.simulations = [Simulation(config) for config in configs]
+        self.alerts = [[] for _ in self.simulations]
+        for alerts, sim in zip(self.alerts, self.simulations):
+            sim.alert_listeners.append(lambda direction, distance, alerts=alerts: alerts.append((direction, distance)))
+        self.current_time = 0
+
+    def step(self, dt):
+        """Advance every unfinished simulation by dt milliseconds"""
+        self.current_time += dt
+        for sim in self.simulations:
+            if not sim.finished:
+                sim.step(self.current_time)
+
+    def run(self, dt=None, max_time=None):
+        """Step until every simulation has consumed its IMU samples, returns one summary per maze"""
+        dt = dt or min(sim.config.imu_interval for sim in self.simulations)
+        while not all(sim.finished for sim in self.simulations):
+            if max_time is not None and self.current_time >= max_time:
+                break
+            self.step(dt)
+        return self.summary()
+
+    def summary(self):
+        """Per-simulation results"""
+        results = []
+        for sim, alerts in zip(self.simulations, self.alerts):
+            results.append({
+                "maze_file": sim.config.maze_file,
+                "size": (sim.maze.height, sim.maze.width),
+                "path_length": len(sim.pathfinder.path),
+                "turns": len(sim.turn_points),
+                "alerts": alerts,
+                "missed_turns": len(sim.turn_points) - sim.next_turn_index,
+                "samples": sim.imu.current_step,
+                "wall_crossings": len(sim.wall_crossings),
+            })
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate several mazes in a single process")
+    parser.add_argument("maze_files", nargs="+", help="maze JSON files to simulate")
+    parser.add_argument("--seed", type=int, default=None, help="IMU noise seed")
+    args = parser.parse_args()
+
+    configs = [SimulationConfig(maze_file=path, seed=args.seed) for path in args.maze_files]
+    for result in BatchSimulator(configs).run():
+        print(f"{result['maze_file']}: {result['size'][0]}x{result['size'][1]}, "
+              f"{result['turns']} turns, {len(result['alerts'])} alerts, "
+              f"{result['missed_turns']} missed, {result['samples']} samples, "
+              f"{result['wall_crossings']} wall crossings")
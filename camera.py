@@ -0,0 +1,207 @@
+# ------ HCARD Group 1 ------
+import pygame
+from collections import OrderedDict
+from maze import WALL_BITS
+from Constants import *
+
+
+class Camera:
+    """Pan/zoom camera over the maze in world (zoom 1 pixel) coordinates"""
+    def __init__(self, view_width, view_height, world_width, world_height, zoom=1):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.world_width = world_width
+        self.world_height = world_height
+        self.zoom_index = ZOOM_LEVELS.index(zoom)
+        self.x = 0  # World coordinates of the top-left corner of the view
+        self.y = 0
+        self.follow = True  # Keep the agent centred; manual panning switches this off
+        self._clamp()
+
+    @property
+    def zoom(self):
+        return ZOOM_LEVELS[self.zoom_index]
+
+    def world_to_screen(self, pos):
+        """Convert a world position to view pixels"""
+        zoom = self.zoom
+        return ((pos[0] - self.x) * zoom, (pos[1] - self.y) * zoom)
+
+    def screen_to_world(self, pos):
+        """Convert view pixels to a world position"""
+        zoom = self.zoom
+        return (pos[0] / zoom + self.x, pos[1] / zoom + self.y)
+
+    def visible_rect(self):
+        """World rectangle (x, y, width, height) covered by the view"""
+        zoom = self.zoom
+        return (self.x, self.y, self.view_width / zoom, self.view_height / zoom)
+
+    def is_visible(self, pos, margin=0):
+        """Check whether a world position (plus margin in world units) is inside the view"""
+        x, y, w, h = self.visible_rect()
+        return x - margin <= pos[0] <= x + w + margin and y - margin <= pos[1] <= y + h + margin
+
+    def center_on(self, pos):
+        """Centre the view on a world position"""
+        zoom = self.zoom
+        self.x = pos[0] - self.view_width / (2 * zoom)
+        self.y = pos[1] - self.view_height / (2 * zoom)
+        self._clamp()
+
+    def pan(self, dx, dy):
+        """Move the view by (dx, dy) screen pixels and stop following the agent"""
+        self.follow = False
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self._clamp()
+
+    def zoom_by(self, steps, anchor=None):
+        """Change zoom level, keeping the world point under `anchor` (view pixels) fixed"""
+        anchor = anchor or (self.view_width / 2, self.view_height / 2)
+        world_anchor = self.screen_to_world(anchor)
+        self.zoom_index = max(0, min(len(ZOOM_LEVELS) - 1, self.zoom_index + steps))
+        self.x = world_anchor[0] - anchor[0] / self.zoom
+        self.y = world_anchor[1] - anchor[1] / self.zoom
+        self._clamp()
+
+    def _clamp(self):
+        """Keep the view inside the maze, centring the maze when it is smaller than the view"""
+        span_w = self.view_width / self.zoom
+        span_h = self.view_height / self.zoom
+        if self.world_width <= span_w:
+            self.x = (self.world_width - span_w) / 2
+        else:
+            self.x = max(0, min(self.x, self.world_width - span_w))
+        if self.world_height <= span_h:
+            self.y = (self.world_height - span_h) / 2
+        else:
+            self.y = max(0, min(self.y, self.world_height - span_h))
+
+
+class SpatialIndex:
+    """Items bucketed by the world-space squares their bounding box overlaps, for viewport queries"""
+    def __init__(self, bucket_size):
+        self.bucket_size = bucket_size
+        self.buckets = {}  # (bx, by) -> [item]
+
+    def insert(self, item, box):
+        """Add an item covering the world box (min x, min y, max x, max y)"""
+        size = self.bucket_size
+        for by in range(int(box[1] // size), int(box[3] // size) + 1):
+            for bx in range(int(box[0] // size), int(box[2] // size) + 1):
+                self.buckets.setdefault((bx, by), []).append(item)
+
+    def query(self, rect):
+        """Items overlapping a world rectangle (x, y, width, height) such as Camera.visible_rect()"""
+        x, y, w, h = rect
+        size = self.bucket_size
+        bx0, by0 = int(x // size), int(y // size)
+        bx1, by1 = int((x + w) // size), int((y + h) // size)
+        if (bx1 - bx0 + 1) * (by1 - by0 + 1) > len(self.buckets):
+            # Zoomed far out: scanning the occupied buckets is cheaper than every square in view
+            keys = [k for k in self.buckets if bx0 <= k[0] <= bx1 and by0 <= k[1] <= by1]
+        else:
+            keys = [(bx, by) for by in range(by0, by1 + 1) for bx in range(bx0, bx1 + 1)
+                    if (bx, by) in self.buckets]
+        seen = set()
+        items = []
+        for key in keys:
+            for item in self.buckets[key]:
+                if item not in seen:
+                    seen.add(item)
+                    items.append(item)
+        return items
+
+
+class TileCache:
+    """Pre-rasterised maze tiles kept in an LRU cache, with coarse tiles when zoomed out"""
+    def __init__(self, maze, cell_size, capacity=TILE_CACHE_SIZE):
+        self.maze = maze
+        self.cell_size = cell_size
+        self.capacity = capacity
+        self.tiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._mask = None
+
+    def cells_per_tile(self, zoom):
+        """Zooming out makes every tile cover more cells, so the tile count on screen stays bounded"""
+        return max(1, int(round(TILE_CELLS / zoom)))
+
+    def invalidate(self):
+        """Drop every cached tile (call after editing walls)"""
+        self.tiles.clear()
+        self._mask = None
+
+    def get(self, tx, ty, zoom):
+        """Return the surface for a tile, rasterising it on a cache miss"""
+        key = (tx, ty, zoom)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+        self.misses += 1
+        tile = self._render(tx, ty, zoom)
+        self.tiles[key] = tile
+        if len(self.tiles) > self.capacity:
+            self.tiles.popitem(last=False)
+        return tile
+
+    def draw(self, surface, camera, origin=(0, 0)):
+        """Blit the tiles overlapping the camera view"""
+        zoom = camera.zoom
+        cells = self.cells_per_tile(zoom)
+        tile_world = cells * self.cell_size
+        tile_px = int(round(tile_world * zoom))
+        x, y, w, h = camera.visible_rect()
+        first_tx = max(0, int(x // tile_world))
+        first_ty = max(0, int(y // tile_world))
+        last_tx = min((self.maze.width - 1) // cells, int((x + w) // tile_world))
+        last_ty = min((self.maze.height - 1) // cells, int((y + h) // tile_world))
+        # Positions are derived from whole tile steps so neighbouring tiles never leave seams
+        offset_x = origin[0] - int(round(x * zoom))
+        offset_y = origin[1] - int(round(y * zoom))
+        for ty in range(first_ty, last_ty + 1):
+            for tx in range(first_tx, last_tx + 1):
+                surface.blit(self.get(tx, ty, zoom), (offset_x + tx * tile_px, offset_y + ty * tile_px))
+
+    def _render(self, tx, ty, zoom):
+        cells = self.cells_per_tile(zoom)
+        cell_px = self.cell_size * zoom
+        if cell_px < LOD_MIN_CELL_PIXELS:
+            return self._render_coarse(tx, ty, cells, int(round(cells * cell_px)))
+
+        tile_px = int(round(cells * cell_px))
+        tile = pygame.Surface((tile_px, tile_px))
+        tile.fill(COLORS['background'])
+        width = max(1, int(round(3 * zoom)))
+        row0, col0 = ty * cells, tx * cells
+        # One extra row/column so walls on the tile border are drawn at full thickness
+        for row in range(row0, min(row0 + cells + 1, self.maze.height)):
+            for col in range(col0, min(col0 + cells + 1, self.maze.width)):
+                x = (col - col0) * cell_px
+                y = (row - row0) * cell_px
+                if self.maze.grid[row][col]['top']:
+                    pygame.draw.line(tile, COLORS['wall'], (x, y), (x + cell_px, y), width)
+                if self.maze.grid[row][col]['left']:
+                    pygame.draw.line(tile, COLORS['wall'], (x, y), (x, y + cell_px), width)
+        return tile
+
+    def _render_coarse(self, tx, ty, cells, tile_px):
+        """Level-of-detail tile: each cell becomes one pixel shaded by its wall density, then smooth-scaled"""
+        import numpy as np
+        if self._mask is None:
+            self._mask = self.maze.to_bitmask()
+        row0, col0 = ty * cells, tx * cells
+        block = self._mask[row0:row0 + cells, col0:col0 + cells]
+        density = np.zeros((cells, cells))
+        density[:block.shape[0], :block.shape[1]] = (
+            ((block & WALL_BITS['top']) > 0).astype(float) + ((block & WALL_BITS['left']) > 0)) / 2
+
+        background = np.array(COLORS['background'], dtype=float)
+        wall = np.array(COLORS['wall'], dtype=float)
+        rgb = background + density[..., None] * (wall - background)
+        image = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2).astype(np.uint8))
+        return pygame.transform.smoothscale(image, (tile_px, tile_px))
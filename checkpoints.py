@@ -0,0 +1,124 @@
+# ------ HCARD Group 1 ------
+"""Periodic checkpoints of a simulated run, with seeking by restore + fast-forward.
+
+    python checkpoints.py maze_data/maze_complex.json --seed 1 --out run.checkpoints.json --seek 5000,12000
+"""
+import argparse
+import bisect
+import json
+from Constants import *
+
+
+class SimulationTimeline:
+    """Checkpoints of one Simulation every `interval` ms of virtual time
+
+    Checkpoints are snapshots without the trail; the timeline keeps a single copy of the
+    append-only trail and wall crossing log and each checkpoint stores their lengths. Seeking
+    drops everything recorded after the restored checkpoint (the live app appends a trail
+    point per frame, so a replay need not reproduce it exactly) and records it again while
+    fast-forwarding.
+
+    `extras` maps names to other per-run state fed by the simulation's sample listeners (such
+    as the occupancy heatmap); each needs snapshot() and restore(state) and is checkpointed too.
+    """
+    def __init__(self, sim, interval=CHECKPOINT_INTERVAL_MS, extras=None):
+        self.sim = sim
+        self.interval = interval
+        self.extras = extras or {}
+        self.checkpoints = []  # snapshots sorted by time
+        self.times = []
+        self.trail = []
+        self.wall_crossings = []
+        self.end_time = None  # time at which the recorded run finished, once known
+        self.record(0)
+
+    def record(self, current_time):
+        """Call after each step: stores a checkpoint once `interval` ms passed since the last one"""
+        sim = self.sim
+        self.trail.extend(sim.agent.trail[len(self.trail):])
+        self.wall_crossings.extend(sim.wall_crossings[len(self.wall_crossings):])
+        if sim.finished and self.end_time is None:
+            self.end_time = current_time
+        if self.times and current_time - self.times[-1] < self.interval:
+            return
+        self.times.append(current_time)
+        checkpoint = sim.snapshot(current_time, include_trail=False)
+        checkpoint["extras"] = {name: extra.snapshot() for name, extra in self.extras.items()}
+        self.checkpoints.append(checkpoint)
+
+    def seek(self, target_time, dt=None):
+        """Restore the nearest checkpoint at or before target_time and fast-forward to it
+
+        Alert listeners are muted while fast-forwarding so skipped alerts are not announced;
+        sample listeners still run, so the extras see every sample. Returns target_time.
+        """
+        sim = self.sim
+        dt = dt or sim.config.imu_interval
+        index = max(bisect.bisect_right(self.times, target_time) - 1, 0)
+        checkpoint = self.checkpoints[index]
+        sim.restore(checkpoint, self.trail, self.wall_crossings)
+        for name, extra in self.extras.items():
+            if name in checkpoint.get("extras", {}):
+                extra.restore(checkpoint["extras"][name])
+        del self.checkpoints[index + 1:], self.times[index + 1:]
+        del self.trail[checkpoint["agent"]["trail_length"]:]
+        del self.wall_crossings[checkpoint["wall_crossing_count"]:]
+        if not sim.finished:
+            self.end_time = None
+
+        current_time = self.times[index]
+        listeners = sim.alert_listeners
+        sim.alert_listeners = []
+        try:
+            while current_time < target_time and not sim.finished:
+                current_time = min(current_time + dt, target_time)
+                sim.step(current_time)
+                self.record(current_time)
+        finally:
+            sim.alert_listeners = listeners
+        return target_time
+
+    def save(self, path):
+        data = {"interval": self.interval, "end_time": self.end_time, "checkpoints": self.checkpoints,
+                "trail": [list(p) for p in self.trail], "wall_crossings": self.wall_crossings}
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    def load(self, path):
+        """Replace the checkpoints with a saved timeline of the same maze and config"""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        self.interval = data["interval"]
+        self.end_time = data["end_time"]
+        self.checkpoints = data["checkpoints"]
+        self.times = [c["time"] for c in self.checkpoints]
+        self.trail = [tuple(p) for p in data["trail"]]
+        self.wall_crossings = data["wall_crossings"]
+
+
+if __name__ == "__main__":
+    from config import SimulationConfig
+    from simulation import Simulation
+
+    parser = argparse.ArgumentParser(description="Record a simulated run with checkpoints and seek in it")
+    parser.add_argument("maze_file", help="maze JSON file")
+    parser.add_argument("--seed", type=int, default=None, help="IMU noise seed")
+    parser.add_argument("--out", default=None, help="write the timeline to this JSON file")
+    parser.add_argument("--seek", default="", help="comma separated times (ms) to restore and print")
+    args = parser.parse_args()
+
+    sim = Simulation(SimulationConfig(maze_file=args.maze_file, seed=args.seed))
+    timeline = SimulationTimeline(sim)
+    current_time = 0
+    while not sim.finished:
+        current_time += sim.config.imu_interval
+        sim.step(current_time)
+        timeline.record(current_time)
+    print(f"Recorded {len(timeline.checkpoints)} checkpoints over {current_time / 1000:.1f}s")
+    if args.out:
+        timeline.save(args.out)
+    for target in filter(None, args.seek.split(',')):
+        timeline.seek(float(target))
+        x, y = sim.agent.current_pos
+        print(f"t={float(target) / 1000:.1f}s: agent ({x:.1f}, {y:.1f}), sample {sim.imu.current_step}, "
+              f"next turn {sim.next_turn_index}/{len(sim.turn_points)}")
@@ -0,0 +1,39 @@
+# ------ HCARD Group 1 ------
+from Constants import *
+
+
+class SimulationConfig:
+    """Per-instance settings; defaults come from Constants.py"""
+    def __init__(self, maze_file=MAZE_FILE, maze_width=MAZE_WIDTH, maze_height=MAZE_HEIGHT,
+                 cell_size=CELL_SIZE, imu_noise=None, imu_interval=IMU_INTERVAL,
+                 max_imu_samples=MAX_IMU_SAMPLES, path_interpolation_step=PATH_INTERPOLATION_STEP,
+                 alert_distance=25, direction_alignment=40, seed=None,
+                 udp_address=('localhost', 65432), use_route_artifacts=True,
+                 planner="astar", wall_crossing_correction=False):
+        self.maze_file = maze_file
+        # Only used when a new maze has to be generated; a loaded maze keeps its own size
+        self.maze_width = maze_width
+        self.maze_height = maze_height
+        self.cell_size = cell_size
+        self.imu_noise = dict(imu_noise if imu_noise is not None else IMU_NOISE)
+        self.imu_interval = imu_interval
+        self.max_imu_samples = max_imu_samples
+        self.path_interpolation_step = path_interpolation_step
+        self.alert_distance = alert_distance  # Advance notification distance (pixels)
+        self.direction_alignment = direction_alignment  # Heading tolerance for alerts (degrees)
+        self.seed = seed  # IMU noise seed (None = non-deterministic)
+        self.udp_address = udp_address  # where position_tracking.py sends real IMU data
+        self.use_route_artifacts = use_route_artifacts  # load/store the precomputed route next to the maze
+        self.planner = planner  # "astar", "hpa" (hpa.py) or "corridor" (corridor_graph.py)
+        self.wall_crossing_correction = wall_crossing_correction  # stop samples at walls they would pass through
+
+    def copy(self, **overrides):
+        """Return a copy with some fields replaced"""
+        config = SimulationConfig.__new__(SimulationConfig)
+        config.__dict__.update(self.__dict__)
+        config.imu_noise = dict(self.imu_noise)
+        for key, value in overrides.items():
+            if key not in config.__dict__:
+                raise AttributeError(f"Unknown config field: {key}")
+            setattr(config, key, value)
+        return config
@@ -0,0 +1,142 @@
+# ------ HCARD Group 1 ------
+import time
+from multiprocessing import Event, Process, shared_memory
+import numpy as np
+from maze import TURN_CODES
+from Constants import *
+
+# One published record per IMU sample and per alert (all float64)
+STATE_FIELDS = ('time', 'x', 'y', 'heading', 'next_turn_index', 'alert_count',
+                'alert_direction', 'alert_distance', 'sample_count', 'finished')
+
+
+class StateRing:
+    """Single-writer ring buffer of state records in shared memory, one seqlock per slot
+
+    Layout: [published count][slot sequence x slots][record number x slots][records].
+    The writer makes a slot's sequence odd while it rewrites the record and even again
+    afterwards, so a reader that sees the same even sequence before and after copying a
+    record got a consistent one. The writer never waits for readers; a reader that falls
+    more than `slots` records behind simply loses the oldest ones.
+    """
+    def __init__(self, slots=STATE_RING_SLOTS, name=None):
+        self.slots = slots
+        size = 8 * (1 + 2 * slots + slots * len(STATE_FIELDS))
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.name = self.shm.name
+        buf = self.shm.buf
+        self.count = np.ndarray((1,), dtype=np.uint64, buffer=buf)
+        self.sequence = np.ndarray((slots,), dtype=np.uint64, buffer=buf, offset=8)
+        self.numbers = np.ndarray((slots,), dtype=np.uint64, buffer=buf, offset=8 * (1 + slots))
+        self.records = np.ndarray((slots, len(STATE_FIELDS)), dtype=np.float64, buffer=buf,
+                                  offset=8 * (1 + 2 * slots))
+        if self.owner:
+            self.count[0] = 0
+            self.sequence[:] = 0
+        self.read_count = 0  # next record number this reader expects
+        self.dropped = 0  # records overwritten or torn before this reader got to them
+
+    def publish(self, record):
+        """Writer side: store one record (sequence of len(STATE_FIELDS) floats)"""
+        number = int(self.count[0])
+        slot = number % self.slots
+        self.sequence[slot] += 1  # odd: write in progress
+        self.numbers[slot] = number
+        self.records[slot] = record
+        self.sequence[slot] += 1  # even: record complete
+        self.count[0] = number + 1
+
+    def read_new(self):
+        """Reader side: every consistent record published since the last call, oldest first"""
+        count = int(self.count[0])
+        first = max(self.read_count, count - self.slots + 1)  # the oldest slot may be mid-rewrite
+        self.dropped += first - self.read_count
+        records = []
+        for number in range(first, count):
+            slot = number % self.slots
+            before = int(self.sequence[slot])
+            record = self.records[slot].copy()
+            valid = int(self.numbers[slot]) == number
+            if before % 2 == 0 and valid and int(self.sequence[slot]) == before:
+                records.append(record)
+            else:
+                self.dropped += 1  # overwritten while we were reading it
+        self.read_count = count
+        return records
+
+    def close(self):
+        del self.count, self.sequence, self.numbers, self.records
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def run_core(config, ring_name, slots, stop_event, simulated=SIMULATION_MODE):
+    """Core process: IMU ingestion, agent update and turn checks, publishing every sample and alert to the ring
+
+    A record is published from the sample listener for each IMU sample (one step may drain
+    several) and from the alert listener for each alert, so the renderer sees all of them in order.
+    """
+    from simulation import Simulation
+    sim = Simulation(config)
+    ring = StateRing(slots, name=ring_name)
+    haptics = None
+    counts = {"samples": 0, "alerts": 0}
+    current = {"time": 0.0, "alert": (None, 0.0)}
+
+    def publish(x, y, heading):
+        direction, distance = current["alert"]
+        ring.publish((current["time"], x, y, heading, sim.next_turn_index, counts["alerts"],
+                      TURN_CODES[direction], distance, counts["samples"], sim.finished))
+
+    def on_sample(imu_data):
+        counts["samples"] += 1
+        publish(*imu_data[:3])
+
+    def on_alert(direction, distance):
+        nonlocal haptics
+        counts["alerts"] += 1
+        current["alert"] = (direction, distance)
+        publish(sim.agent.current_pos[0], sim.agent.current_pos[1], sim.agent.current_heading)
+        if not simulated:
+            if haptics is None:
+                from haptics import HapticDispatcher
+                haptics = HapticDispatcher()
+            haptics.submit(direction, sim.last_sample_time, sim.current_turn_alert["turn"])
+    sim.sample_listeners.append(on_sample)
+    sim.alert_listeners.append(on_alert)
+
+    start = time.perf_counter()
+    try:
+        while not stop_event.is_set():
+            current["time"] = (time.perf_counter() - start) * 1000
+            published = counts["samples"]
+            sim.step(current["time"], simulated=simulated)
+            if simulated and counts["samples"] == published:
+                time.sleep(0.001)  # the real IMU socket already blocks briefly in get_real_imu_data
+    finally:
+        if haptics is not None:
+            haptics.close()
+        ring.close()
+
+
+class CoreProcess:
+    """Runs run_core() in a child process; the renderer polls it without ever blocking the core"""
+    def __init__(self, config, slots=STATE_RING_SLOTS):
+        self.ring = StateRing(slots)
+        self.stop_event = Event()
+        self.process = Process(target=run_core, name="simulation-core", daemon=True,
+                               args=(config, self.ring.name, slots, self.stop_event))
+        self.process.start()
+
+    def poll(self):
+        """New state records as dicts keyed by STATE_FIELDS"""
+        return [dict(zip(STATE_FIELDS, record.tolist())) for record in self.ring.read_new()]
+
+    def close(self):
+        self.stop_event.set()
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.ring.close()
@@ -0,0 +1,194 @@
+# ------ HCARD Group 1 ------
+import heapq
+from maze import DIRECTIONS
+from pathfinder import turn_direction
+from Constants import *
+
+
+class CorridorGraph:
+    """Maze compiled into junctions/dead ends joined by weighted corridor edges
+
+    Every cell with other than two exits (plus the start and end cells) becomes a node.
+    Each edge keeps its cells from node "a" to node "b", its length and the turns along it,
+    so search, turn detection and distance queries never have to expand corridor cells.
+    """
+    def __init__(self, maze):
+        self.maze = maze
+        self.nodes = set()
+        self.edges = []  # {"a", "b", "cells", "length", "turns": [(offset, direction)]} in a -> b order
+        self.adjacency = {}  # node -> [(edge index, neighbour node)]
+        self.cell_index = {}  # corridor cell -> (edge index, offset from "a")
+        self._compile()
+
+    # ----- compilation -----
+    def _exits(self, cell):
+        row, col = cell
+        return [(row + dr, col + dc) for side, (dr, dc) in DIRECTIONS.items()
+                if not self.maze.grid[row][col][side]]
+
+    def _compile(self):
+        for row in range(self.maze.height):
+            for col in range(self.maze.width):
+                if len(self._exits((row, col))) != 2:
+                    self.nodes.add((row, col))
+        self.nodes.update({tuple(self.maze.start), tuple(self.maze.end)})
+        for node in self.nodes:
+            self.adjacency[node] = []
+
+        walked = set()  # (node, first cell) pairs already covered by an edge
+        for node in list(self.nodes):
+            self._walk_from(node, walked)
+
+        # Closed loops of corridor cells never reach a node; promote one cell per loop
+        for row in range(self.maze.height):
+            for col in range(self.maze.width):
+                cell = (row, col)
+                if cell not in self.nodes and cell not in self.cell_index:
+                    self.nodes.add(cell)
+                    self.adjacency[cell] = []
+                    self._walk_from(cell, walked)
+
+    def _walk_from(self, node, walked):
+        for first in self._exits(node):
+            if (node, first) in walked:
+                continue
+            cells = [node, first]
+            while cells[-1] not in self.nodes:
+                cells.append(next(c for c in self._exits(cells[-1]) if c != cells[-2]))
+            walked.add((node, first))
+            walked.add((cells[-1], cells[-2]))
+
+            index = len(self.edges)
+            turns = []
+            for offset in range(1, len(cells) - 1):
+                self.cell_index[cells[offset]] = (index, offset)
+                turn = turn_direction(cells[offset - 1], cells[offset], cells[offset + 1])
+                if turn:
+                    turns.append((offset, turn[0]))
+            self.edges.append({"a": node, "b": cells[-1], "cells": cells,
+                               "length": len(cells) - 1, "turns": turns})
+            self.adjacency[node].append((index, cells[-1]))
+            if cells[-1] != node:
+                self.adjacency[cells[-1]].append((index, node))
+            else:
+                self.adjacency[node].append((index, node))  # loop back to the same junction
+
+    # ----- positions on the graph -----
+    def _anchors(self, cell):
+        """Ways to leave a cell: [(node, cost, (edge, from offset, to offset))]"""
+        cell = tuple(cell)
+        if cell in self.nodes:
+            return [(cell, 0, None)]
+        index, offset = self.cell_index[cell]
+        edge = self.edges[index]
+        return [(edge["a"], offset, (index, offset, 0)),
+                (edge["b"], edge["length"] - offset, (index, offset, edge["length"]))]
+
+    def _traversal_between(self, index, a, b):
+        """Full traversal of an edge from node a to node b"""
+        edge = self.edges[index]
+        if edge["a"] == a and edge["b"] == b:
+            return (index, 0, edge["length"])
+        return (index, edge["length"], 0)
+
+    # ----- queries -----
+    def route(self, start, goal):
+        """Shortest route as a list of edge traversals (edge, from offset, to offset), and its length"""
+        start, goal = tuple(start), tuple(goal)
+        if start == goal:
+            return [], 0
+
+        best = None
+        if start not in self.nodes and goal not in self.nodes:
+            (si, so), (gi, go) = self.cell_index[start], self.cell_index[goal]
+            if si == gi:
+                best = (abs(so - go), [(si, so, go)])  # both on the same corridor
+
+        goal_links = {}
+        for node, cost, traversal in self._anchors(goal):
+            # Reverse the goal's exit so it runs from the node into the goal cell
+            link = None if traversal is None else (traversal[0], traversal[2], traversal[1])
+            if node not in goal_links or cost < goal_links[node][0]:
+                goal_links[node] = (cost, link)
+
+        dist = {}
+        came_from = {}
+        heap = []
+        for node, cost, traversal in self._anchors(start):
+            if cost < dist.get(node, float('inf')):
+                dist[node] = cost
+                came_from[node] = (None, traversal)
+                heapq.heappush(heap, (cost, node))
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if cost > dist[node] or (best and cost >= best[0]):
+                continue
+            if node in goal_links:
+                total = cost + goal_links[node][0]
+                if best is None or total < best[0]:
+                    best = (total, self._unwind(came_from, node) + [goal_links[node][1]])
+            for index, neighbor in self.adjacency[node]:
+                new_cost = cost + self.edges[index]["length"]
+                if new_cost < dist.get(neighbor, float('inf')):
+                    dist[neighbor] = new_cost
+                    came_from[neighbor] = (node, self._traversal_between(index, node, neighbor))
+                    heapq.heappush(heap, (new_cost, neighbor))
+        if best is None:
+            return None, float('inf')
+        return [t for t in best[1] if t is not None and t[1] != t[2]], best[0]
+
+    def _unwind(self, came_from, node):
+        traversals = []
+        while node is not None:
+            previous, traversal = came_from[node]
+            traversals.append(traversal)
+            node = previous
+        return traversals[::-1]
+
+    def distance(self, start, goal):
+        """Length of the shortest route in cells (inf if unreachable)"""
+        return self.route(start, goal)[1]
+
+    def cells(self, traversals):
+        """Map a route back to the cell path used for rendering"""
+        path = []
+        for index, first, last in traversals:
+            cells = self.edges[index]["cells"]
+            step = 1 if last >= first else -1
+            segment = cells[first:last + step if last + step >= 0 else None:step]
+            path.extend(segment if not path else segment[1:])
+        return path
+
+    def turns(self, traversals):
+        """Turns along a route as [{"grid_pos", "direction", "index"}], index = cells from the start"""
+        turns = []
+        travelled = 0
+        previous_step = None
+        for index, first, last in traversals:
+            edge = self.edges[index]
+            cells = edge["cells"]
+            step = 1 if last >= first else -1
+            # Turn at the junction joining the previous traversal to this one
+            if previous_step is not None:
+                junction = cells[first]
+                prev_cell = (junction[0] - previous_step[0], junction[1] - previous_step[1])
+                turn = turn_direction(prev_cell, junction, cells[first + step])
+                if turn:
+                    turns.append({"grid_pos": junction, "direction": turn[0], "index": travelled})
+            low, high = min(first, last), max(first, last)
+            inner = [(offset, direction) for offset, direction in edge["turns"] if low < offset < high]
+            for offset, direction in (inner if step > 0 else reversed(inner)):
+                if step < 0:
+                    direction = "Left" if direction == "Right" else "Right"  # walked backwards
+                turns.append({"grid_pos": cells[offset], "direction": direction,
+                              "index": travelled + abs(offset - first)})
+            travelled += abs(last - first)
+            previous_step = (cells[last][0] - cells[last - step][0], cells[last][1] - cells[last - step][1])
+        return turns
+
+    def find_path(self, start, goal):
+        """Cell path between two cells (same interface as HierarchicalPathFinder)"""
+        if tuple(start) == tuple(goal):
+            return [tuple(start)]
+        traversals, _ = self.route(start, goal)
+        return self.cells(traversals) if traversals is not None else []
@@ -0,0 +1,91 @@
+# ------ HCARD Group 1 ------
+from collections import deque
+import numpy as np
+from maze import WALL_BITS, DIRECTIONS, TURN_CODES, TURN_NAMES
+from pathfinder import turn_direction
+from Constants import *
+
+MOVE_SIDES = tuple(DIRECTIONS)  # move codes 0-3: top, bottom, left, right
+MOVES = tuple(DIRECTIONS.values())
+
+
+class FlowField:
+    """Guidance towards maze.end for every cell, computed once by reverse BFS
+
+    Arrays are (height, width):
+    - next_move: move code towards the goal (-1 at the goal or if unreachable)
+    - distance: cells left to the goal (-1 if unreachable)
+    - turn_distance: cells to the next turn along that route (-1 if no turn is left)
+    - turn_direction: 0 none, 1 Left, 2 Right
+    - turn_cell: flat index (row * width + col) of the next turn cell (-1 if none)
+    """
+    def __init__(self, maze):
+        self.maze = maze
+        self.height, self.width = maze.height, maze.width
+        shape = (self.height, self.width)
+        self.next_move = np.full(shape, -1, dtype=np.int8)
+        self.distance = np.full(shape, -1, dtype=np.int32)
+        self.turn_distance = np.full(shape, -1, dtype=np.int32)
+        self.turn_direction = np.zeros(shape, dtype=np.int8)
+        self.turn_cell = np.full(shape, -1, dtype=np.int32)
+        self._compute()
+
+    def _compute(self):
+        mask = self.maze.to_bitmask()
+        goal = tuple(self.maze.end)
+        self.distance[goal] = 0
+        queue = deque([goal])
+        while queue:
+            parent = queue.popleft()
+            parent_move = self.next_move[parent]
+            walls = mask[parent]
+            for code, (dr, dc) in enumerate(MOVES):
+                if walls & WALL_BITS[MOVE_SIDES[code]]:
+                    continue
+                cell = (parent[0] + dr, parent[1] + dc)
+                if self.distance[cell] >= 0:
+                    continue
+                # The child steps back through the side it was reached from
+                move = code ^ 1  # top<->bottom, left<->right
+                self.next_move[cell] = move
+                self.distance[cell] = self.distance[parent] + 1
+                if parent != goal and parent_move != move:
+                    after = (parent[0] + MOVES[parent_move][0], parent[1] + MOVES[parent_move][1])
+                    turn = turn_direction(cell, parent, after)
+                    self.turn_distance[cell] = 1
+                    self.turn_direction[cell] = TURN_CODES[turn[0] if turn else None]
+                    self.turn_cell[cell] = parent[0] * self.width + parent[1]
+                elif self.turn_distance[parent] >= 0:  # same direction, inherit the parent's next turn
+                    self.turn_distance[cell] = self.turn_distance[parent] + 1
+                    self.turn_direction[cell] = self.turn_direction[parent]
+                    self.turn_cell[cell] = self.turn_cell[parent]
+                queue.append(cell)
+
+    def cell_at(self, pos, cell_size):
+        """Grid cell (row, col) containing a screen position, clamped to the maze"""
+        row = min(max(int(pos[1] // cell_size), 0), self.height - 1)
+        col = min(max(int(pos[0] // cell_size), 0), self.width - 1)
+        return (row, col)
+
+    def lookup(self, cell):
+        """Guidance for one cell as a dict (no search involved)"""
+        turn_cell = int(self.turn_cell[cell])
+        return {
+            "next_move": int(self.next_move[cell]),
+            "distance": int(self.distance[cell]),
+            "turn_distance": int(self.turn_distance[cell]),
+            "turn_direction": TURN_NAMES[int(self.turn_direction[cell])],
+            "turn_cell": divmod(turn_cell, self.width) if turn_cell >= 0 else None,
+        }
+
+    def route_from(self, cell):
+        """Cell path to the goal by following next_move (for rendering / debugging)"""
+        cell = tuple(cell)
+        if self.distance[cell] < 0:
+            return []
+        path = [cell]
+        while self.next_move[cell] >= 0:
+            dr, dc = MOVES[self.next_move[cell]]
+            cell = (cell[0] + dr, cell[1] + dc)
+            path.append(cell)
+        return path
@@ -0,0 +1,157 @@
+# ------ HCARD Group 1 ------
+import os
+import queue
+import shutil
+import threading
+import time
+import numpy as np
+import pygame
+from Constants import *
+
+
+def export_format(path):
+    """Output format from the file name: .gif, .rgb/.raw (raw RGB24 video) or a directory of PNGs"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.gif':
+        return 'gif'
+    if ext in ('.rgb', '.raw'):
+        return 'raw'
+    return 'png'
+
+
+class FrameExporter:
+    """Encodes captured frames on a background thread
+
+    submit() only copies the surface pixels into a bounded queue, so rendering blocks just when
+    the encoder falls more than queue_size frames behind. Each frame is compared with the
+    previous one: GIF frames are written as the changed rectangle only (an unchanged frame
+    extends the previous frame's delay), unchanged PNG frames reuse the previous file, and raw
+    video stores every frame as-is.
+    """
+    def __init__(self, path, size, fps=EXPORT_FPS, queue_size=EXPORT_QUEUE_SIZE):
+        self.path = path
+        self.format = export_format(path)
+        self.size = size
+        self.fps = fps
+        self.frame_count = 0  # frames submitted
+        self.encoded_count = 0  # frames that needed encoding (changed)
+        self.wait_time = 0.0  # seconds submit() spent blocked on a full queue
+        self.error = None
+        if self.format == 'gif':
+            try:
+                from PIL import Image, GifImagePlugin
+            except ImportError:
+                raise ImportError("GIF export needs Pillow (pip install pillow), use a .rgb file or a PNG directory instead")
+            self._Image, self._gif = Image, GifImagePlugin
+        elif self.format == 'png':
+            os.makedirs(path, exist_ok=True)
+        self._file = None
+        self._previous = None
+        self._palette = None
+        self._pending = None  # last GIF frame, held back until its delay is known
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = threading.Thread(target=self._run, name="frame-export", daemon=True)
+        self._worker.start()
+
+    def submit(self, surface):
+        """Queue a copy of the surface for encoding"""
+        pixels = pygame.image.tobytes(surface, "RGB")
+        start = time.perf_counter()
+        self._queue.put((self.frame_count, pixels))
+        self.wait_time += time.perf_counter() - start
+        self.frame_count += 1
+
+    def close(self):
+        """Flush the queue and finish the file"""
+        self._queue.put(None)
+        self._worker.join()
+        if self.error is not None:
+            print(f"Frame export failed: {self.error}")
+
+    # ----- encoder thread -----
+    def _run(self):
+        item = ()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                index, pixels = item
+                frame = np.frombuffer(pixels, dtype=np.uint8).reshape(self.size[1], self.size[0], 3)
+                bbox = self._changed_box(frame)
+                if bbox is not None:
+                    self.encoded_count += 1
+                getattr(self, f"_write_{self.format}")(index, frame, bbox)
+                self._previous = frame
+            self._finish()
+        except Exception as e:
+            self.error = e
+            # Keep draining so submit() never blocks forever on a dead worker
+            while item is not None:
+                item = self._queue.get()
+        finally:
+            if self._file is not None:
+                self._file.close()
+
+    def _changed_box(self, frame):
+        """(left, top, right, bottom) of the pixels that differ from the previous frame, None if identical"""
+        if self._previous is None:
+            return (0, 0, self.size[0], self.size[1])
+        changed = (frame != self._previous).any(axis=2)
+        rows = np.flatnonzero(changed.any(axis=1))
+        if not len(rows):
+            return None
+        cols = np.flatnonzero(changed.any(axis=0))
+        return (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+    def _frame_delay(self, index):
+        """GIF delay of one frame in milliseconds, rounded so the total never drifts from fps"""
+        return (round((index + 1) * 100 / self.fps) - round(index * 100 / self.fps)) * 10
+
+    def _write_gif(self, index, frame, bbox):
+        Image = self._Image
+        if self._palette is None:
+            # One global palette from the first frame plus every UI colour, so later alerts keep theirs
+            swatches = np.array([list(COLORS.values())], dtype=np.uint8)
+            sample = Image.fromarray(np.concatenate([frame.reshape(1, -1, 3), swatches], axis=1))
+            self._palette = sample.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+            canvas = Image.new('RGB', self.size).quantize(palette=self._palette, dither=Image.Dither.NONE)
+            header, _ = self._gif.getheader(canvas, info={"loop": 0, "optimize": False})
+            self._file = open(self.path, 'wb')
+            self._file.write(b"".join(header))
+        if bbox is None:
+            self._pending[2] += self._frame_delay(index)
+            return
+        self._flush_gif()
+        left, top, right, bottom = bbox
+        crop = Image.fromarray(np.ascontiguousarray(frame[top:bottom, left:right]))
+        crop = crop.quantize(palette=self._palette, dither=Image.Dither.NONE)
+        self._pending = [crop, (left, top), self._frame_delay(index)]
+
+    def _flush_gif(self):
+        if self._pending is not None:
+            crop, offset, delay = self._pending
+            self._file.write(b"".join(self._gif.getdata(crop, offset, duration=delay)))
+            self._pending = None
+
+    def _write_png(self, index, frame, bbox):
+        name = os.path.join(self.path, f"frame_{index:05d}.png")
+        if bbox is None:
+            # Same picture as before: copy the already encoded file
+            shutil.copyfile(os.path.join(self.path, f"frame_{index - 1:05d}.png"), name)
+            return
+        pygame.image.save(pygame.image.frombuffer(frame.tobytes(), self.size, "RGB"), name)
+
+    def _write_raw(self, index, frame, bbox):
+        if self._file is None:
+            self._file = open(self.path, 'wb')
+        self._file.write(frame.tobytes())
+
+    def _finish(self):
+        if self.format == 'gif' and self._file is not None:
+            self._flush_gif()
+            self._file.write(b";")  # GIF trailer
+        elif self.format == 'raw':
+            width, height = self.size
+            print(f"Raw video written, convert with: ffmpeg -f rawvideo -pix_fmt rgb24 -s {width}x{height} "
+                  f"-r {self.fps} -i {self.path} output.mp4")
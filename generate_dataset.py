@@ -0,0 +1,145 @@
+# ------ HCARD Group 1 ------
+"""Generate a dataset of mazes with their shortest paths, in parallel.
+
+    python generate_dataset.py --count 5000 --out ./maze_dataset --sizes 15x10,30x30 \
+        --algorithms prim,backtracker --loopiness 0,0.05,0.1 --workers 8
+
+Mazes are written to compressed shards (shard_00000.npz, ...) next to an index.json that
+lists every maze with its parameters, so single mazes can be read back with load_maze().
+"""
+import argparse
+import json
+import os
+from multiprocessing import Pool
+import numpy as np
+from maze import MazeGenerator
+from pathfinder import PathFinder
+
+ALGORITHMS = ('prim', 'backtracker')
+
+
+def maze_parameters(maze_id, base_seed, sizes, algorithms, loopiness):
+    """Deterministic per-maze parameters, independent of worker count and scheduling"""
+    rng = np.random.default_rng([base_seed, maze_id])
+    width, height = sizes[rng.integers(0, len(sizes))]
+    return {
+        'id': maze_id,
+        'seed': [base_seed, maze_id],
+        'width': int(width),
+        'height': int(height),
+        'algorithm': algorithms[rng.integers(0, len(algorithms))],
+        'loopiness': float(loopiness[rng.integers(0, len(loopiness))]),
+    }
+
+
+def verify_maze(maze):
+    """Walls agree on both sides, the border is closed and every cell is reachable from the start"""
+    mask = maze.to_bitmask()
+    if not (mask[0, :] & 1).all() or not (mask[-1, :] & 2).all() or \
+       not (mask[:, 0] & 4).all() or not (mask[:, -1] & 8).all():
+        return False
+    if ((mask[:-1, :] & 2) > 0).tolist() != ((mask[1:, :] & 1) > 0).tolist():
+        return False
+    if ((mask[:, :-1] & 8) > 0).tolist() != ((mask[:, 1:] & 4) > 0).tolist():
+        return False
+    seen = {maze.start}
+    stack = [maze.start]
+    while stack:
+        for neighbor in maze._get_traversable_neighbors(stack.pop()):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                stack.append(neighbor)
+    return len(seen) == maze.width * maze.height
+
+
+def build_maze(params):
+    """Worker: generate, verify and solve one maze"""
+    rng = np.random.default_rng(params['seed'] + [1])
+    maze = MazeGenerator.empty(params['width'], params['height'])
+    if params['algorithm'] == 'backtracker':
+        maze.generate_backtracker_maze(rng)
+    else:
+        maze.generate_new_maze(rng)
+    if params['loopiness'] > 0:
+        maze.add_loops(params['loopiness'], rng)
+
+    valid = verify_maze(maze)
+    pathfinder = PathFinder(maze)
+    result = dict(params, valid=valid, start=list(maze.start), end=list(maze.end),
+                  path_length=len(pathfinder.path), turns=len(pathfinder.turn_points))
+    arrays = {'walls': maze.to_bitmask(), 'path': np.array(pathfinder.path, dtype=np.int32)}
+    return result, arrays
+
+
+def write_shard(out_dir, shard, entries, arrays):
+    name = f"shard_{shard:05d}.npz"
+    np.savez_compressed(os.path.join(out_dir, name),
+                        **{f"{entry['id']}_{key}": value
+                           for entry, item in zip(entries, arrays) for key, value in item.items()})
+    for entry in entries:
+        entry['shard'] = name
+    return entries
+
+
+def generate_dataset(out_dir, count, sizes, algorithms, loopiness, base_seed=0,
+                     workers=None, shard_size=1000):
+    """Generate `count` mazes across a process pool, returns the index entries"""
+    os.makedirs(out_dir, exist_ok=True)
+    params = [maze_parameters(i, base_seed, sizes, algorithms, loopiness) for i in range(count)]
+    index = []
+    entries, arrays = [], []
+    with Pool(workers) as pool:
+        # imap keeps the input order, so shard contents do not depend on scheduling
+        for result, item in pool.imap(build_maze, params, chunksize=max(1, min(64, count // 64))):
+            entries.append(result)
+            arrays.append(item)
+            if len(entries) == shard_size:
+                index.extend(write_shard(out_dir, len(index) // shard_size, entries, arrays))
+                entries, arrays = [], []
+    if entries:
+        index.extend(write_shard(out_dir, len(index) // shard_size, entries, arrays))
+
+    with open(os.path.join(out_dir, 'index.json'), 'w') as f:
+        json.dump({'count': count, 'base_seed': base_seed, 'shard_size': shard_size, 'mazes': index}, f)
+    return index
+
+
+def load_maze(out_dir, maze_id):
+    """Random access to one maze of a dataset: returns (MazeGenerator, path, index entry)"""
+    with open(os.path.join(out_dir, 'index.json'), 'r') as f:
+        entry = json.load(f)['mazes'][maze_id]
+    with np.load(os.path.join(out_dir, entry['shard'])) as shard:
+        walls = shard[f"{maze_id}_walls"]
+        path = [tuple(p) for p in shard[f"{maze_id}_path"].tolist()]
+    return MazeGenerator.from_bitmask(walls, entry['start'], entry['end']), path, entry
+
+
+def _parse_sizes(text):
+    sizes = []
+    for item in text.split(','):
+        width, height = item.lower().split('x')
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a sharded maze dataset in parallel")
+    parser.add_argument("--count", type=int, required=True, help="number of mazes")
+    parser.add_argument("--out", default="./maze_dataset", help="output directory")
+    parser.add_argument("--sizes", default="15x10", help="comma separated WIDTHxHEIGHT choices")
+    parser.add_argument("--algorithms", default="prim", help=f"comma separated, from {ALGORITHMS}")
+    parser.add_argument("--loopiness", default="0", help="comma separated fractions of extra walls removed")
+    parser.add_argument("--seed", type=int, default=0, help="base seed")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--shard-size", type=int, default=1000, help="mazes per shard")
+    args = parser.parse_args()
+
+    algorithms = args.algorithms.split(',')
+    unknown = set(algorithms) - set(ALGORITHMS)
+    if unknown:
+        parser.error(f"unknown algorithm(s): {', '.join(sorted(unknown))}")
+    index = generate_dataset(args.out, args.count, _parse_sizes(args.sizes), algorithms,
+                             [float(v) for v in args.loopiness.split(',')], args.seed,
+                             args.workers, args.shard_size)
+    invalid = sum(1 for entry in index if not entry['valid'])
+    print(f"Wrote {len(index)} mazes to {args.out} ({invalid} failed verification)")
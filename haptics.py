@@ -0,0 +1,203 @@
+# ------ HCARD Group 1 ------
+import json
+import socket
+import threading
+import time
+from collections import deque
+from Constants import *
+
+
+class UDPHapticTransport:
+    """Sends vibration commands to the device and waits for its acknowledgement"""
+    def __init__(self, address=HAPTIC_DEVICE_ADDRESS, ack_timeout=HAPTIC_ACK_TIMEOUT):
+        self.address = address
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.settimeout(ack_timeout)
+
+    def send(self, command_id, direction):
+        """Send one command, returns True once the device acknowledged it"""
+        payload = json.dumps({'id': command_id, 'direction': direction}).encode()
+        self.socket.sendto(payload, self.address)
+        deadline = time.perf_counter() + self.socket.gettimeout()
+        while time.perf_counter() < deadline:
+            try:
+                raw_data, _ = self.socket.recvfrom(1024)
+            except socket.timeout:
+                return False
+            try:
+                reply = json.loads(raw_data.decode('utf-8'))
+            except ValueError:
+                continue  # Ignore garbage and keep waiting for our ack
+            if isinstance(reply, dict) and reply.get('ack') == command_id:
+                return True
+        return False
+
+    def close(self):
+        self.socket.close()
+
+
+class HapticDispatcher:
+    """Non-blocking vibration command queue with its own worker thread
+
+    Alerts are coalesced per turn (the turn's cell, or the direction when no turn is given):
+    a repeat of a turn sent within the coalesce window is dropped, a repeat of a turn that is
+    still queued replaces the queued command. Alerts for different turns are all delivered, in order.
+    """
+    def __init__(self, transport=None, coalesce_window=HAPTIC_COALESCE_MS, history=HAPTIC_HISTORY):
+        self.transport = transport or UDPHapticTransport()
+        self.coalesce_window = coalesce_window / 1000  # seconds
+        self.records = deque(maxlen=history)  # One timestamp record per dispatched command
+        self.dropped = 0  # Alerts suppressed as repeats of a recently sent turn
+        self.merged = 0  # Alerts that replaced a still queued command for the same turn
+        self._pending = {}  # turn key -> command, in submission order
+        self._last_sent = {}  # turn key -> decision time of the last dispatched command
+        self._next_id = 0
+        self._condition = threading.Condition()
+        self._running = True
+        self._worker = threading.Thread(target=self._run, name="haptic-dispatch", daemon=True)
+        self._worker.start()
+
+    def submit(self, direction, sample_time=None, turn=None):
+        """Queue a vibration command and return immediately (False if it was dropped as a repeat)
+
+        sample_time is the perf_counter() timestamp at which the triggering IMU sample was
+        received, turn identifies the announced turn (e.g. its (row, col) cell).
+        """
+        decision_time = time.perf_counter()
+        key = turn if turn is not None else direction
+        with self._condition:
+            last = self._last_sent.get(key)
+            if last is not None and decision_time - last < self.coalesce_window:
+                self.dropped += 1  # Same turn announced again within the window
+                return False
+            if key in self._pending:
+                self.merged += 1  # Only the newest alert for a turn matters
+            self._pending[key] = {
+                'direction': direction,
+                'turn': turn,
+                'sample_time': sample_time if sample_time is not None else decision_time,
+                'decision_time': decision_time,
+            }
+            self._condition.notify()
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                key = next(iter(self._pending))
+                command = self._pending.pop(key)
+                command['id'] = self._next_id
+                self._next_id += 1
+                self._last_sent[key] = command['decision_time']
+
+            command['sent_time'] = time.perf_counter()
+            try:
+                acked = self.transport.send(command['id'], command['direction'])
+            except OSError as e:
+                print(f"Haptic send failure: {str(e)}")
+                acked = False
+            command['ack_time'] = time.perf_counter() if acked else None
+            self.records.append(command)
+
+    def latency_stats(self):
+        """Milliseconds from IMU sample to decision, decision to ack and sample to ack (mean, max)"""
+        stages = {'sample_to_decision': [], 'decision_to_ack': [], 'sample_to_ack': []}
+        for record in list(self.records):
+            stages['sample_to_decision'].append(record['decision_time'] - record['sample_time'])
+            if record['ack_time'] is not None:
+                stages['decision_to_ack'].append(record['ack_time'] - record['decision_time'])
+                stages['sample_to_ack'].append(record['ack_time'] - record['sample_time'])
+        return {name: (1000 * sum(values) / len(values), 1000 * max(values)) if values else (0.0, 0.0)
+                for name, values in stages.items()}
+
+    def close(self, timeout=1.0):
+        """Stop the worker (a command in flight is allowed to finish)"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._worker.join(timeout)
+        self.transport.close()
+
+
+class MockHapticDevice:
+    """Local stand-in for the vibration device: acknowledges every command over UDP
+
+    With noise=True each ack is preceded by a valid JSON reply that is not an ack object.
+    """
+    def __init__(self, address=('localhost', 0), delay=0.0, noise=False):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(address)
+        self.socket.settimeout(0.1)
+        self.address = self.socket.getsockname()
+        self.delay = delay  # Simulated Bluetooth round trip (seconds)
+        self.noise = noise
+        self.received = []
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="mock-haptic-device", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            try:
+                raw_data, sender = self.socket.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            command = json.loads(raw_data.decode('utf-8'))
+            self.received.append(command)
+            if self.delay:
+                time.sleep(self.delay)
+            if self.noise:
+                self.socket.sendto(json.dumps([command['id']]).encode(), sender)
+            self.socket.sendto(json.dumps({'ack': command['id']}).encode(), sender)
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        self.socket.close()
+
+
+def self_check(delay=0.05):
+    """Run the dispatcher against the mock device and assert on acks, coalescing and latency"""
+    device = MockHapticDevice(delay=delay, noise=True)
+    dispatcher = HapticDispatcher(UDPHapticTransport(device.address), coalesce_window=500)
+    try:
+        received = lambda: time.perf_counter() - 0.001  # the IMU sample arrived 1 ms before the decision
+        assert dispatcher.submit("Left", received(), turn=(1, 1))
+        time.sleep(2 * delay)
+        assert not dispatcher.submit("Left", received(), turn=(1, 1)), "repeat of a sent turn was not dropped"
+        assert dispatcher.submit("Left", received(), turn=(2, 5)), "another turn in the same direction was dropped"
+        time.sleep(2 * delay)
+        dispatcher.submit("Right", received(), turn=(3, 3))
+        time.sleep(delay / 5)  # (3, 3) is now in flight
+        dispatcher.submit("Left", received(), turn=(4, 4))
+        dispatcher.submit("Left", received(), turn=(4, 4))  # still queued: merged
+        time.sleep(3 * delay)
+    finally:
+        dispatcher.close()
+        device.close()
+
+    turns = [tuple(record['turn']) for record in dispatcher.records]
+    assert turns == [(1, 1), (2, 5), (3, 3), (4, 4)], f"unexpected commands {turns}"
+    assert [c['id'] for c in device.received] == [r['id'] for r in dispatcher.records]
+    assert all(record['ack_time'] is not None for record in dispatcher.records), "a command was not acked"
+    assert (dispatcher.dropped, dispatcher.merged) == (1, 1), (dispatcher.dropped, dispatcher.merged)
+    stats = dispatcher.latency_stats()
+    assert 1.0 <= stats['sample_to_decision'][0] < 1000 * delay, stats
+    assert stats['decision_to_ack'][0] >= 1000 * delay, stats
+    assert stats['sample_to_ack'][0] >= stats['decision_to_ack'][0], stats
+    return dispatcher, device
+
+
+if __name__ == "__main__":
+    # Exercise the dispatcher against the mock device, check it and print the latency budget
+    dispatcher, device = self_check()
+    print(f"device received {len(device.received)} commands, {dispatcher.dropped} suppressed, "
+          f"{dispatcher.merged} merged")
+    for stage, (mean, worst) in dispatcher.latency_stats().items():
+        print(f"{stage:<20} mean {mean:6.2f} ms  max {worst:6.2f} ms")
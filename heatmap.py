@@ -0,0 +1,152 @@
+# ------ HCARD Group 1 ------
+import os
+import pygame
+from Constants import *
+
+
+class OccupancyHeatmap:
+    """Where the agent has been: visit counts on a grid of bins_per_cell x bins_per_cell bins per maze cell
+
+    `counts` holds raw sample counts for offline analysis, `density` the same counts decayed with
+    a half-life so the overlay favours recent movement. Bins on the planned route and off it are
+    drawn in different colours, which shows where walkers went wrong. The arrays (and numpy)
+    are only set up once the first sample is flushed.
+    """
+    def __init__(self, maze, cell_size, route=(), bins_per_cell=HEATMAP_BINS_PER_CELL,
+                 half_life=HEATMAP_HALF_LIFE_MS):
+        self.bins_per_cell = bins_per_cell
+        self.bin_size = cell_size / bins_per_cell
+        self.shape = (maze.height * bins_per_cell, maze.width * bins_per_cell)
+        self.half_life = half_life
+        self.route = list(route)
+        self.counts = None  # allocated by _allocate()
+        self.density = None
+        self.route_mask = None
+        self.show_overlay = HEATMAP_ENABLED
+        self._pending = []  # positions waiting for the next update()
+        self._last_decay = None
+        self._overlay = None  # (visible bin window, surface) of the last drawn overlay
+
+    def add(self, sample):
+        """Record one agent position (cheap, the arrays are updated in update())"""
+        self._pending.append(sample[:2])
+
+    def _allocate(self):
+        """Create the bin arrays on first use"""
+        if self.counts is not None:
+            return
+        import numpy as np
+        self.counts = np.zeros(self.shape, dtype=np.uint32)
+        self.density = np.zeros(self.shape, dtype=np.float32)
+        bins = self.bins_per_cell
+        on_route = np.zeros((self.shape[0] // bins, self.shape[1] // bins), dtype=bool)
+        for row, col in self.route:
+            on_route[row, col] = True
+        self.route_mask = np.kron(on_route, np.ones((bins, bins), dtype=bool))
+
+    def update(self, current_time):
+        """Decay the density by the time since the last update and add the pending samples"""
+        if self._last_decay is not None and self.half_life and self.density is not None:
+            elapsed = current_time - self._last_decay
+            if elapsed > 0:
+                self.density *= self.density.dtype.type(0.5 ** (elapsed / self.half_life))
+        self._last_decay = current_time
+        self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        import numpy as np
+        self._allocate()
+        bins = np.floor(np.asarray(self._pending, dtype=np.float64) / self.bin_size).astype(np.int64)
+        self._pending = []
+        rows = np.clip(bins[:, 1], 0, self.shape[0] - 1)
+        cols = np.clip(bins[:, 0], 0, self.shape[1] - 1)
+        np.add.at(self.counts, (rows, cols), 1)
+        np.add.at(self.density, (rows, cols), 1)
+        self._overlay = None  # uniform decay alone does not change the normalised image
+
+    def snapshot(self):
+        """Visited bins with their counts and density, for simulation checkpoints (checkpoints.py)"""
+        self._flush()
+        if self.counts is None:
+            return {"bins": [], "counts": [], "density": []}
+        import numpy as np
+        bins = np.flatnonzero(self.counts)
+        return {"bins": bins.tolist(), "counts": self.counts.flat[bins].tolist(),
+                "density": self.density.flat[bins].tolist()}
+
+    def restore(self, state):
+        self._pending = []
+        self._overlay = None
+        if self.counts is None and not state["bins"]:
+            return
+        self._allocate()
+        self.counts[:] = 0
+        self.density[:] = 0
+        self.counts.flat[state["bins"]] = state["counts"]
+        self.density.flat[state["bins"]] = state["density"]
+
+    def off_route_fraction(self):
+        """Share of all samples that fell outside the planned route's cells"""
+        self._allocate()
+        total = self.counts.sum()
+        return float(self.counts[~self.route_mask].sum() / total) if total else 0.0
+
+    def draw(self, surface, camera):
+        """Blend the visible part of the heatmap over the maze with a single blit"""
+        if not self.show_overlay or self.counts is None:
+            return
+        import numpy as np
+        x, y, w, h = camera.visible_rect()
+        r0 = max(int(y // self.bin_size), 0)
+        c0 = max(int(x // self.bin_size), 0)
+        r1 = min(int(np.ceil((y + h) / self.bin_size)), self.shape[0])
+        c1 = min(int(np.ceil((x + w) / self.bin_size)), self.shape[1])
+        if r1 <= r0 or c1 <= c0:
+            return
+        window = (r0, c0, r1, c1)
+        if self._overlay is None or self._overlay[0] != window:
+            self._overlay = (window, self._render(window))
+        image = self._overlay[1]
+
+        zoom = camera.zoom
+        size = (max(1, int(round((c1 - c0) * self.bin_size * zoom))),
+                max(1, int(round((r1 - r0) * self.bin_size * zoom))))
+        surface.blit(pygame.transform.scale(image, size),
+                     camera.world_to_screen((c0 * self.bin_size, r0 * self.bin_size)))
+
+    def _render(self, window):
+        import numpy as np
+        r0, c0, r1, c1 = window
+        density = self.density[r0:r1, c0:c1]
+        peak = self.density.max()
+        level = np.sqrt(density / peak) if peak > 0 else density  # sqrt keeps short visits visible
+        on_route = self.route_mask[r0:r1, c0:c1, None]
+        rgb = np.where(on_route, np.array(COLORS['heat_route']), np.array(COLORS['heat_off_route']))
+
+        image = pygame.Surface((c1 - c0, r1 - r0), pygame.SRCALPHA, 32)
+        pygame.surfarray.blit_array(image, rgb.transpose(1, 0, 2).astype(np.uint8))
+        alpha = pygame.surfarray.pixels_alpha(image)
+        alpha[:] = (level.T * HEATMAP_ALPHA).astype(np.uint8)
+        del alpha  # unlock the surface
+        return image
+
+    def export(self, path, maze_hash):
+        """Add this session's counts to the archive at path (same maze only), returns the session total"""
+        self._flush()
+        import numpy as np
+        self._allocate()
+        counts = self.counts.astype(np.uint64)
+        sessions = 1
+        if os.path.exists(path):
+            with np.load(path) as previous:
+                if str(previous['maze_hash']) == maze_hash and previous['counts'].shape == counts.shape:
+                    counts += previous['counts']
+                    sessions += int(previous['sessions'])
+                else:
+                    print(f"{path} belongs to a different maze or resolution, starting a new archive")
+        np.savez_compressed(path, counts=counts, last_session=self.counts, route_mask=self.route_mask,
+                            bins_per_cell=self.bins_per_cell, bin_size=self.bin_size,
+                            maze_hash=maze_hash, sessions=sessions)
+        return sessions
@@ -0,0 +1,58 @@
+# ------ HCARD Group 1 ------
+import numpy as np
+
+# Sensor order of a HyperIMU packet as configured for position_tracking.py
+MAG, GYR, ORI = 0, 2, 3
+
+HIMU_FRAME_DTYPE = np.dtype([
+    ('mag', np.float64, 3),     # magnetometer x, y, z
+    ('gyr', np.float64, 3),     # gyroscope x, y, z
+    ('ori', np.float64, 3),     # orientation yaw, pitch, roll (degrees)
+    ('pitch', np.float64),      # theta = -ori pitch
+    ('roll', np.float64),       # phi = -ori roll
+    ('mag_heading', np.float64),  # atan2(mag y, mag x) in degrees
+    ('yaw_rate', np.float64),   # heading rate from the gyroscope, used by KalmanFilterHeading.predict
+])
+
+
+def _frame_values(sensors):
+    """The 9 values of one packet as strings, or None if a sensor is missing or short"""
+    if len(sensors) <= ORI:
+        return None
+    values = []
+    for index in (MAG, GYR, ORI):
+        if sensors[index] is None or len(sensors[index]) < 3:
+            return None
+        values.extend(sensors[index][:3])
+    return values
+
+
+def parse_sensor_batch(sensorData):
+    """Parse one HIMUServer notify() batch into a HIMU_FRAME_DTYPE array with derived angles
+
+    Complete packets are converted in a single np.array() call; a batch containing a
+    malformed number falls back to per-packet conversion and drops only the bad packets.
+    """
+    rows = [values for values in map(_frame_values, sensorData) if values is not None]
+    try:
+        raw = np.array(rows, dtype=np.float64).reshape(-1, 9)
+    except ValueError:
+        parsed = []
+        for values in rows:
+            try:
+                parsed.append([float(v) for v in values])
+            except ValueError:
+                continue
+        raw = np.array(parsed, dtype=np.float64).reshape(-1, 9)
+
+    frames = np.zeros(len(raw), dtype=HIMU_FRAME_DTYPE)
+    frames['mag'] = raw[:, 0:3]
+    frames['gyr'] = raw[:, 3:6]
+    frames['ori'] = raw[:, 6:9]
+    theta = -raw[:, 7]
+    phi = -raw[:, 8]
+    frames['pitch'] = theta
+    frames['roll'] = phi
+    frames['mag_heading'] = np.arctan2(raw[:, 1], raw[:, 0]) * (180 / np.pi)
+    frames['yaw_rate'] = (raw[:, 4] * np.sin(phi) + raw[:, 5] * np.cos(phi)) / np.cos(theta)
+    return frames
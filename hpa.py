@@ -0,0 +1,238 @@
+# ------ HCARD Group 1 ------
+import heapq
+import json
+import os
+from collections import deque
+from maze import DIRECTIONS, OPPOSITE
+from route_artifacts import artifact_path, maze_file_hash
+from Constants import *
+
+HPA_ARTIFACT_VERSION = 1
+
+
+class HierarchicalPathFinder:
+    """HPA* planner: clusters of cells joined by an abstract graph of border entrances
+
+    Every opening between two clusters becomes a pair of entrance nodes, and each cluster
+    stores the exact in-cluster distances between its entrances, so routes found on the
+    abstract graph are as short as a flat A* search.
+    """
+    def __init__(self, maze, cluster_size=HPA_CLUSTER_SIZE, build=True):
+        self.maze = maze
+        self.cluster_size = cluster_size
+        self.entrances = {}  # cluster -> set of entrance cells
+        self.edges = {}  # entrance cell -> {entrance cell: cost}
+        if build:
+            self.build()
+
+    # ----- abstract graph construction -----
+    def cluster_of(self, cell):
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def _clusters(self):
+        rows = (self.maze.height + self.cluster_size - 1) // self.cluster_size
+        cols = (self.maze.width + self.cluster_size - 1) // self.cluster_size
+        return [(r, c) for r in range(rows) for c in range(cols)]
+
+    def _cluster_bounds(self, cluster):
+        row0, col0 = cluster[0] * self.cluster_size, cluster[1] * self.cluster_size
+        return (row0, col0, min(row0 + self.cluster_size, self.maze.height),
+                min(col0 + self.cluster_size, self.maze.width))
+
+    def build(self):
+        """Precompute entrances and intra-cluster distances for the whole maze"""
+        self.entrances = {cluster: set() for cluster in self._clusters()}
+        self.edges = {}
+        self._rebuild(set(self.entrances))
+
+    def _rebuild(self, touched):
+        """Recompute entrances and intra-cluster edges of the touched clusters only"""
+        for cluster in touched:
+            for node in self.entrances.get(cluster, ()):
+                for neighbor in self.edges.pop(node, {}):
+                    self.edges.get(neighbor, {}).pop(node, None)
+            self.entrances[cluster] = set()
+
+        # Border openings of touched clusters (partners in untouched clusters keep their intra edges)
+        for cluster in touched:
+            row0, col0, row1, col1 = self._cluster_bounds(cluster)
+            border = [(row0, c, 'top') for c in range(col0, col1)] + \
+                     [(row1 - 1, c, 'bottom') for c in range(col0, col1)] + \
+                     [(r, col0, 'left') for r in range(row0, row1)] + \
+                     [(r, col1 - 1, 'right') for r in range(row0, row1)]
+            for row, col, side in border:
+                dr, dc = DIRECTIONS[side]
+                other = (row + dr, col + dc)
+                if self.maze.grid[row][col][side] or not self._in_maze(other):
+                    continue
+                self._add_edge((row, col), other, 1)
+                self.entrances[cluster].add((row, col))
+                self.entrances.setdefault(self.cluster_of(other), set()).add(other)
+
+        for cluster in touched:
+            for node in self.entrances[cluster]:
+                for target, cost in self._cluster_distances(node, cluster).items():
+                    if target != node and target in self.entrances[cluster]:
+                        self._add_edge(node, target, cost)
+
+    def _add_edge(self, a, b, cost):
+        self.edges.setdefault(a, {})[b] = cost
+        self.edges.setdefault(b, {})[a] = cost
+
+    def _in_maze(self, cell):
+        return 0 <= cell[0] < self.maze.height and 0 <= cell[1] < self.maze.width
+
+    def _neighbors(self, cell):
+        row, col = cell
+        for side, (dr, dc) in DIRECTIONS.items():
+            if not self.maze.grid[row][col][side]:
+                yield (row + dr, col + dc)
+
+    def _cluster_bfs(self, start, cluster, goal=None):
+        """BFS restricted to one cluster, returns the came_from map"""
+        came_from = {start: None}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if current == goal:
+                break
+            for neighbor in self._neighbors(current):
+                if neighbor not in came_from and self.cluster_of(neighbor) == cluster:
+                    came_from[neighbor] = current
+                    queue.append(neighbor)
+        return came_from
+
+    def _cluster_distances(self, start, cluster):
+        came_from = self._cluster_bfs(start, cluster)
+        distances = {start: 0}
+        for cell in came_from:  # BFS order, so parents are always resolved first
+            if came_from[cell] is not None:
+                distances[cell] = distances[came_from[cell]] + 1
+        return distances
+
+    def _cluster_path(self, start, goal, cluster):
+        came_from = self._cluster_bfs(start, cluster, goal)
+        if goal not in came_from:
+            return None
+        path = [goal]
+        while came_from[path[-1]] is not None:
+            path.append(came_from[path[-1]])
+        return path[::-1]
+
+    # ----- wall edits -----
+    def set_wall(self, row, col, side, present):
+        """Add or remove a wall and rebuild only the clusters on either side of it"""
+        dr, dc = DIRECTIONS[side]
+        other = (row + dr, col + dc)
+        if not self._in_maze(other):
+            if not present:
+                raise ValueError("The outer boundary of the maze cannot be opened")
+            return
+        self.maze.grid[row][col][side] = bool(present)
+        self.maze.grid[other[0]][other[1]][OPPOSITE[side]] = bool(present)
+        self._rebuild({self.cluster_of((row, col)), self.cluster_of(other)})
+
+    # ----- queries -----
+    def find_path(self, start, goal):
+        """Shortest cell path from start to goal, or [] if unreachable"""
+        start, goal = tuple(start), tuple(goal)
+        if start == goal:
+            return [start]
+
+        # Temporary links from start/goal to the entrances of their own clusters
+        extra = {start: {}, goal: {}}
+        for cell in (start, goal):
+            cluster = self.cluster_of(cell)
+            distances = self._cluster_distances(cell, cluster)
+            for node in self.entrances.get(cluster, ()):
+                if node in distances and node != cell:
+                    extra[cell][node] = distances[node]
+            if cell == start and goal in distances:
+                extra[start][goal] = distances[goal]  # goal reachable without leaving the cluster
+
+        def neighbors(node):
+            yield from self.edges.get(node, {}).items()
+            yield from extra.get(node, {}).items()
+            if node in extra[goal]:
+                yield goal, extra[goal][node]
+
+        def heuristic(cell):
+            return abs(cell[0] - goal[0]) + abs(cell[1] - goal[1])
+
+        g_score = {start: 0}
+        came_from = {}
+        open_heap = [(heuristic(start), start)]
+        closed = set()
+        while open_heap:
+            current = heapq.heappop(open_heap)[1]
+            if current == goal:
+                break
+            if current in closed:
+                continue
+            closed.add(current)
+            for neighbor, cost in neighbors(current):
+                tentative_g = g_score[current] + cost
+                if tentative_g < g_score.get(neighbor, float('inf')):
+                    g_score[neighbor] = tentative_g
+                    came_from[neighbor] = current
+                    heapq.heappush(open_heap, (tentative_g + heuristic(neighbor), neighbor))
+        if goal not in g_score:
+            return []
+
+        abstract = [goal]
+        while abstract[-1] != start:
+            abstract.append(came_from[abstract[-1]])
+        abstract.reverse()
+        return self._refine(abstract)
+
+    def _refine(self, abstract):
+        """Expand abstract hops into cells, searching only the clusters the route passes through"""
+        path = [abstract[0]]
+        for a, b in zip(abstract, abstract[1:]):
+            if self.cluster_of(a) != self.cluster_of(b):
+                path.append(b)  # Inter-cluster hop across an opening
+            else:
+                path.extend(self._cluster_path(a, b, self.cluster_of(a))[1:])
+        return path
+
+    # ----- persistence -----
+    def to_dict(self):
+        edges = [[a[0], a[1], b[0], b[1], cost]
+                 for a, targets in self.edges.items() for b, cost in targets.items() if a < b]
+        return {"cluster_size": self.cluster_size, "edges": edges,
+                "entrances": [[c[0], c[1], [list(n) for n in nodes]]
+                              for c, nodes in self.entrances.items()]}
+
+    def save(self, maze_file):
+        """Store the abstract graph next to the maze file"""
+        data = self.to_dict()
+        data["hash"] = maze_file_hash(maze_file, HPA_ARTIFACT_VERSION, self.cluster_size)
+        with open(artifact_path(maze_file, "hpa"), 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load_or_build(cls, maze, cluster_size=HPA_CLUSTER_SIZE):
+        """Load the persisted abstract graph for maze.maze_file, rebuilding it when missing or stale
+
+        Mazes without a backing file (MazeGenerator.empty() / from_bitmask()) are built in memory only.
+        """
+        if maze.maze_file is None or not os.path.exists(maze.maze_file):
+            return cls(maze, cluster_size)
+        path = artifact_path(maze.maze_file, "hpa")
+        expected = maze_file_hash(maze.maze_file, HPA_ARTIFACT_VERSION, cluster_size)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                if data.get("hash") == expected:
+                    planner = cls(maze, cluster_size, build=False)
+                    planner.entrances = {(r, c): {tuple(n) for n in nodes}
+                                         for r, c, nodes in data["entrances"]}
+                    for r0, c0, r1, c1, cost in data["edges"]:
+                        planner._add_edge((r0, c0), (r1, c1), cost)
+                    return planner
+            except Exception as e:
+                print(f"Error loading HPA graph: {str(e)}")
+        planner = cls(maze, cluster_size)
+        planner.save(maze.maze_file)
+        return planner
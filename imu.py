@@ -1,26 +1,73 @@
 # ------ HCARD Group 1 ------
-import numpy as np
 import socket
 import json
+import struct
+import sys
+import time
 from math import sqrt, atan2, radians
 from Constants import *
+from config import SimulationConfig
+
+# Kernel receive timestamps for UDP datagrams (the socket module does not export the Linux value)
+SO_TIMESTAMPNS = getattr(socket, 'SO_TIMESTAMPNS', 35 if sys.platform.startswith('linux') else None)
 
 class IMUSimulator:
     """IMU sensor simulator with pre-generated path"""
-    def __init__(self, path):
+    def __init__(self, path, config=None, interpolated_path=None):
+        self.config = config or SimulationConfig()
+        self._rng = None
         self.original_path = self._convert_to_screen_coords(path)
-        self.interpolated_path = self._interpolate_path()
+        if interpolated_path is not None:
+            self.interpolated_path = [tuple(p) for p in interpolated_path]  # from a route artifact
+        else:
+            self.interpolated_path = self._interpolate_path()
         self.current_step = 0
         self.last_update_time = 0
         self.history = []
-        # UDP socket for receiving IMU data
-        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.udp_socket.bind(('localhost', 65432))
-        self.udp_socket.settimeout(0.01)
+        self._udp_socket = None  # bound on first use, so simulated instances never claim the port
+        self.last_receive_time = None  # perf_counter() when the last real datagram was received
+
+    @property
+    def rng(self):
+        """Noise generator, numpy is only imported once a simulated sample is needed"""
+        if self._rng is None:
+            import numpy as np
+            self._rng = np.random.default_rng(self.config.seed)
+        return self._rng
+
+    @property
+    def udp_socket(self):
+        """UDP socket for receiving IMU data"""
+        if self._udp_socket is None:
+            self._udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._udp_socket.bind(self.config.udp_address)
+            self._udp_socket.settimeout(0.01)
+            if SO_TIMESTAMPNS is not None:
+                # Let the kernel stamp each datagram on arrival, see _receive()
+                self._udp_socket.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+        return self._udp_socket
+
+    def _receive(self):
+        """One datagram and the perf_counter() time it reached the socket
+
+        Datagrams can wait in the socket buffer until the next frame drains them, so the
+        kernel's arrival timestamp is used where available instead of the time recvmsg returns.
+        """
+        if SO_TIMESTAMPNS is None:
+            raw_data, _ = self.udp_socket.recvfrom(1024)
+            return raw_data, time.perf_counter()
+        raw_data, ancdata, _, _ = self.udp_socket.recvmsg(1024, socket.CMSG_SPACE(16))
+        now, wall_now = time.perf_counter(), time.time()
+        for level, kind, value in ancdata:
+            if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS:
+                seconds, nanoseconds = struct.unpack('qq', value[:16])
+                return raw_data, now - max(wall_now - (seconds + nanoseconds * 1e-9), 0.0)
+        return raw_data, now
         
     def _convert_to_screen_coords(self, path):
         """Convert grid coordinates to screen coordinates"""
-        return [(CELL_SIZE*(c+0.5), CELL_SIZE*(r+0.5)) for (r, c) in path]
+        cell_size = self.config.cell_size
+        return [(cell_size*(c+0.5), cell_size*(r+0.5)) for (r, c) in path]
     
     def _convert_real_to_screen(self, real_x, real_y):
         """ 
@@ -38,8 +85,8 @@ class IMUSimulator:
         - y increases downward
         - Center of each grid cell: (x+0.5)*CELL_SIZE, (y+0.5)*CELL_SIZE
         """
-        screen_x = (real_x + 0.5) * CELL_SIZE  # Column index → pixel coordinates (center)
-        screen_y = (real_y + 0.5) * CELL_SIZE  # Row index → pixel coordinates (center)
+        screen_x = (real_x + 0.5) * self.config.cell_size  # Column index → pixel coordinates (center)
+        screen_y = (real_y + 0.5) * self.config.cell_size  # Row index → pixel coordinates (center)
         return screen_x, screen_y
 
     def _interpolate_path(self):
@@ -59,11 +106,11 @@ class IMUSimulator:
             distance = sqrt(dx**2 + dy**2)
 
             # Calculate number of interpolated points based on step size (minimum 1 step)
-            step_size_pixels = CELL_SIZE * PATH_INTERPOLATION_STEP
+            step_size_pixels = self.config.cell_size * self.config.path_interpolation_step
             steps = max(int(distance / step_size_pixels), 1)
 
             # Generate interpolated points (include start, exclude end)
-            for t in np.linspace(0, 1, steps, endpoint=False):
+            for t in (i / steps for i in range(steps)):
                 x = start_x + t * dx
                 y = start_y + t * dy
                 interpolated.append((x, y))
@@ -75,6 +122,7 @@ class IMUSimulator:
     def _print_UDP_raw_data(self):  # FOR DEBUG ONLY
         """ print raw data from UDP socket"""
         try:
+            self.udp_socket.settimeout(0.01)
             raw_data, _ = self.udp_socket.recvfrom(1024)
             try:
                 parsed_data = json.loads(raw_data.decode('utf-8'))
@@ -91,14 +139,16 @@ class IMUSimulator:
             return None
         pass
 
-    def get_real_imu_data(self):
+    def get_real_imu_data(self, timeout=0.01):
         """
         Receive real IMU data via UDP and convert to window coordinates
+        timeout: seconds to wait for a datagram (0 = only take one that is already queued)
         Returns: (x_pixel, y_pixel, theta_degrees)
         """
         try:
             # Receive raw data
-            raw_data, _ = self.udp_socket.recvfrom(1024)
+            self.udp_socket.settimeout(timeout)
+            raw_data, self.last_receive_time = self._receive()
             data = json.loads(raw_data.decode('utf-8'))
             
             # Extract fields
@@ -123,7 +173,7 @@ class IMUSimulator:
         except KeyError:
             print("Error: Missing required fields (x/y/heading)")
             return None
-        except socket.timeout:
+        except (socket.timeout, BlockingIOError):
             return None  # Silent return when no data
         except Exception as e:
             print(f"Unknown error: {str(e)}")
@@ -131,25 +181,26 @@ class IMUSimulator:
 
     def get_simulated_imu(self, current_time):
         if self.current_step >= len(self.interpolated_path) or \
-        self.current_step >= MAX_IMU_SAMPLES:
+        self.current_step >= self.config.max_imu_samples:
             return None
         
-        if current_time - self.last_update_time < IMU_INTERVAL:
+        if current_time - self.last_update_time < self.config.imu_interval:
             return None
         
         # Get interpolated path point
         base_x, base_y = self.interpolated_path[self.current_step]
         
         # Add noise to position
-        x = base_x + np.random.normal(0, IMU_NOISE['position'])
-        y = base_y + np.random.normal(0, IMU_NOISE['position'])
+        noise = self.config.imu_noise
+        x = base_x + self.rng.normal(0, noise['position'])
+        y = base_y + self.rng.normal(0, noise['position'])
         
         # Calculate heading based on previous point
         if len(self.history) >= 1:
             prev_x, prev_y, _ = self.history[-1]
             dx = x - prev_x
             dy = y - prev_y
-            theta = atan2(dy, dx) + np.random.normal(0, IMU_NOISE['heading'])
+            theta = atan2(dy, dx) + self.rng.normal(0, noise['heading'])
         else:
             theta = 0  # Initial heading when no history exists
         
@@ -1,6 +1,28 @@
 # ------ HCARD Group 1 ------
-from application import MainApplication
+import os
+import sys
 
 if __name__ == "__main__":
-    app = MainApplication()
-    app.run()
\ No newline at end of file
+    if "--headless" in sys.argv:
+        # Simulation only: no pygame window, no UDP socket
+        from simulation import Simulation
+        sim = Simulation()
+        sim.alert_listeners.append(lambda direction, distance: print(f"Turn {direction} {distance:.1f} units ahead!"))
+        elapsed = sim.run_headless()
+        print(f"Simulated {sim.imu.current_step} IMU samples ({elapsed / 1000:.1f}s)")
+    elif "--export" in sys.argv:
+        # Off-screen rendering on the virtual clock: python main.py --export demo.gif [--fps 20]
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        from application import MainApplication
+        from Constants import EXPORT_FPS
+        path = sys.argv[sys.argv.index("--export") + 1]
+        fps = int(sys.argv[sys.argv.index("--fps") + 1]) if "--fps" in sys.argv else EXPORT_FPS
+        if not MainApplication().export(path, fps):
+            sys.exit(1)
+    else:
+        from application import MainApplication
+        if "--core-process" in sys.argv:
+            app = MainApplication(core_process=True)
+        else:
+            app = MainApplication()
+        app.run()
@@ -1,26 +1,66 @@
-import numpy as np
 import json
 import os
+from collections import deque
 from Constants import *
+from config import SimulationConfig
+
+WALL_BITS = {'top': 1, 'bottom': 2, 'left': 4, 'right': 8}  # bit layout used by MazeGenerator.to_bitmask()
+DIRECTIONS = {'top': (-1, 0), 'bottom': (1, 0), 'left': (0, -1), 'right': (0, 1)}  # (row, col) step through each side
+OPPOSITE = {'top': 'bottom', 'bottom': 'top', 'left': 'right', 'right': 'left'}
+TURN_CODES = {None: 0, "Left": 1, "Right": 2}  # turn directions as numbers, for arrays and shared memory
+TURN_NAMES = {code: name for name, code in TURN_CODES.items()}
 
 
 class MazeGenerator:
     """Maze generator with file persistence and guaranteed path"""
-    def __init__(self):
+    def __init__(self, config=None):
+        self.config = config or SimulationConfig()
+        self.maze_file = self.config.maze_file
+        self.width = self.config.maze_width
+        self.height = self.config.maze_height
         self.grid = []
         self.start = (0, 0)
-        self.end = (MAZE_HEIGHT-1, MAZE_WIDTH-1)
+        self.end = (self.height-1, self.width-1)
         
         if not self.load_from_file():
-            # self.generate_new_maze()  # generate a new complex maze
-            self.generate_simple_maze() # generate a simple maze (2 turns)
+            if (self.width, self.height) == (15, 10):
+                self.generate_simple_maze() # generate a simple maze (2 turns), its layout is drawn for 15x10
+            else:
+                self.generate_new_maze()  # generate a new complex maze of the configured size
             self.save_to_file()
 
-    def generate_new_maze(self):
+    @classmethod
+    def empty(cls, width, height, config=None):
+        """In-memory maze of the given size (all walls up), not backed by a file"""
+        maze = cls.__new__(cls)
+        maze.config = config or SimulationConfig()
+        maze.maze_file = None
+        maze.width = width
+        maze.height = height
+        maze.grid = [[{'top': True, 'bottom': True, 'left': True, 'right': True}
+                      for _ in range(width)] for _ in range(height)]
+        maze.start = (0, 0)
+        maze.end = (height-1, width-1)
+        return maze
+
+    @classmethod
+    def from_bitmask(cls, mask, start, end, config=None):
+        """Rebuild a maze from the array produced by to_bitmask()"""
+        height, width = mask.shape
+        maze = cls.empty(width, height, config)
+        maze.grid = [[{side: bool(mask[row, col] & bit) for side, bit in WALL_BITS.items()}
+                      for col in range(width)] for row in range(height)]
+        maze.start = tuple(int(v) for v in start)
+        maze.end = tuple(int(v) for v in end)
+        return maze
+
+    def generate_new_maze(self, rng=None):
         """Generate new maze using Prim's algorithm with path verification"""
+        import numpy as np
+        rng = rng if rng is not None else np.random.default_rng()
         while True:
             self.grid = [[{'top': True, 'bottom': True, 'left': True, 'right': True} 
-                        for _ in range(MAZE_WIDTH)] for _ in range(MAZE_HEIGHT)]
+                        for _ in range(self.width)] for _ in range(self.height)]
             
             visited = set()
             walls = []
@@ -30,8 +70,9 @@ class MazeGenerator:
                 walls.append((self.start[0], self.start[1], wall))
                 
             while walls:
-                idx = np.random.randint(0, len(walls))
-                row, col, direction = walls.pop(idx)
+                idx = rng.integers(0, len(walls))
+                walls[idx], walls[-1] = walls[-1], walls[idx]  # O(1) removal of a random wall
+                row, col, direction = walls.pop()
                 nr, nc = self._get_adjacent_cell(row, col, direction)
                 
                 if (nr, nc) not in visited:
@@ -44,13 +85,46 @@ class MazeGenerator:
             if self._path_exists():
                 break
 
+    def generate_backtracker_maze(self, rng=None):
+        """Generate new maze with a randomized depth-first search (long, winding corridors)"""
+        import numpy as np
+        rng = rng if rng is not None else np.random.default_rng()
+        self.grid = [[{'top': True, 'bottom': True, 'left': True, 'right': True}
+                    for _ in range(self.width)] for _ in range(self.height)]
+        visited = {self.start}
+        stack = [self.start]
+        while stack:
+            row, col = stack[-1]
+            options = [d for d in self._get_neighbors(row, col)
+                       if self._get_adjacent_cell(row, col, d) not in visited]
+            if not options:
+                stack.pop()
+                continue
+            direction = options[rng.integers(0, len(options))]
+            nr, nc = self._get_adjacent_cell(row, col, direction)
+            self._remove_wall(row, col, nr, nc, direction)
+            visited.add((nr, nc))
+            stack.append((nr, nc))
+
+    def add_loops(self, loopiness, rng=None):
+        """Knock down a fraction (0-1) of the remaining interior walls to create alternative routes"""
+        import numpy as np
+        rng = rng if rng is not None else np.random.default_rng()
+        walls = [(row, col, direction) for row in range(self.height) for col in range(self.width)
+                 for direction in ('bottom', 'right') if self.grid[row][col][direction]
+                 and direction in self._get_neighbors(row, col)]
+        count = int(round(loopiness * len(walls)))
+        for idx in rng.permutation(len(walls))[:count]:
+            row, col, direction = walls[idx]
+            self._remove_wall(row, col, *self._get_adjacent_cell(row, col, direction), direction)
+
     def _path_exists(self):
         """Verify path existence using BFS"""
         visited = set()
-        queue = [self.start]
+        queue = deque([self.start])
         
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             if current == self.end:
                 return True
                 
@@ -72,16 +146,19 @@ class MazeGenerator:
 
     def load_from_file(self):
         """Load maze from JSON file"""
-        if not os.path.exists(MAZE_FILE):
+        if not os.path.exists(self.maze_file):
             return False
             
         try:
-            with open(MAZE_FILE, 'r') as f:
+            with open(self.maze_file, 'r') as f:
                 data = json.load(f)
                 self.grid = [[{k: bool(v) for k, v in cell.items()} 
                             for cell in row] for row in data['grid']]
                 self.start = tuple(data['start'])
                 self.end = tuple(data['end'])
+                # Dimensions always come from the loaded grid, not from the config
+                self.height = len(self.grid)
+                self.width = len(self.grid[0])
                 return True
         except Exception as e:
             print(f"Error loading maze: {str(e)}")
@@ -89,23 +166,33 @@ class MazeGenerator:
 
     def save_to_file(self):
         """Save maze to JSON file"""
-        os.makedirs(os.path.dirname(MAZE_FILE), exist_ok=True)
+        os.makedirs(os.path.dirname(self.maze_file), exist_ok=True)
         data = {
             'grid': [[{k: int(v) for k, v in cell.items()} 
                     for cell in row] for row in self.grid],
             'start': self.start,
             'end': self.end
         }
-        with open(MAZE_FILE, 'w') as f:
+        with open(self.maze_file, 'w') as f:
             json.dump(data, f, indent=2)
 
+    def to_bitmask(self):
+        """Return the walls as a (height, width) uint8 array using WALL_BITS"""
+        import numpy as np
+        mask = np.zeros((self.height, self.width), dtype=np.uint8)
+        for row in range(self.height):
+            for col in range(self.width):
+                cell = self.grid[row][col]
+                mask[row, col] = sum(bit for side, bit in WALL_BITS.items() if cell[side])
+        return mask
+
     def _get_neighbors(self, row, col):
         """Get valid neighbor directions"""
         neighbors = []
         if row > 0: neighbors.append('top')
-        if row < MAZE_HEIGHT-1: neighbors.append('bottom')
+        if row < self.height-1: neighbors.append('bottom')
         if col > 0: neighbors.append('left')
-        if col < MAZE_WIDTH-1: neighbors.append('right')
+        if col < self.width-1: neighbors.append('right')
         return neighbors
 
     def _get_adjacent_cell(self, row, col, direction):
@@ -132,7 +219,7 @@ class MazeGenerator:
 
     def generate_simple_maze(self):
         """generate a simple maze"""
-        self.grid = [[{'top':1,'bottom':1,'left':1,'right':1} for _ in range(MAZE_WIDTH)] for _ in range(MAZE_HEIGHT)]
+        self.grid = [[{'top':1,'bottom':1,'left':1,'right':1} for _ in range(self.width)] for _ in range(self.height)]
         
         # main path：right→down→right→down→right(2 corners)
         path = [
@@ -3,24 +3,67 @@ import heapq
 from math import atan2, degrees, pi
 from Constants import *
 
+def turn_direction(prev, current, next_):
+    """Classify the move prev -> current -> next_ as ("Left"|"Right", angle) or None if straight"""
+    # Calculate direction vectors (grid coordinates)
+    vec_in = (prev[1] - current[1], current[0] - prev[0])    # Rotated 90° for screen coordinates
+    vec_out = (next_[1] - current[1], current[0] - next_[0]) 
+    
+    # Skip straight movements
+    if vec_in[0]*vec_out[1] == vec_in[1]*vec_out[0]:  # Check colinearity
+        return None
+        
+    # Calculate angles (considering screen Y-axis points downward)
+    angle_in = atan2(-vec_in[1], vec_in[0])  # Invert Y component
+    angle_out = atan2(-vec_out[1], vec_out[0])
+    diff = (angle_out - angle_in + pi) % (2*pi) - pi
+    
+    # Valid turn condition: angle change > 10 degrees
+    if abs(degrees(diff)) <= 10:
+        return None
+    # Determine turn direction
+    direction = "Left" if diff > 0 else "Right"  # Adjusted for coordinate rotation
+    return direction, abs(degrees(diff))
+
+
 class PathFinder:
     """A* pathfinding with turn point detection"""
-    def __init__(self, maze):
+    def __init__(self, maze, config=None, route=None):
         self.maze = maze
+        self.config = config or maze.config
         self.path = []
+        self.segments = []  # Straight runs of the path (start index, end index, direction)
         self.turn_points = []  # Stores turn point data (index, position, direction)
+        if route is not None:
+            # Precomputed route artifact (see route_artifacts.py), skip the search
+            self.path = [tuple(p) for p in route["path"]]
+            self.segments = route["segments"]
+            self.turn_points = [dict(t, grid_pos=tuple(t["grid_pos"]), screen_pos=tuple(t["screen_pos"]))
+                                for t in route["turn_points"]]
+            return
         self._find_path()
+        self._build_segments()
         self._detect_turn_directions()
         
     def _find_path(self):
+        if self.config.planner == "hpa":
+            from hpa import HierarchicalPathFinder
+            planner = HierarchicalPathFinder.load_or_build(self.maze)
+            self.path = planner.find_path(self.maze.start, self.maze.end)
+            return
+        if self.config.planner == "corridor":
+            from corridor_graph import CorridorGraph
+            self.path = CorridorGraph(self.maze).find_path(self.maze.start, self.maze.end)
+            return
+
         start = self.maze.start
         end = self.maze.end
         open_heap = []
         closed = set()
         came_from = {}
         
-        g_score = {(r, c): float('inf') for r in range(MAZE_HEIGHT) for c in range(MAZE_WIDTH)}
-        f_score = {(r, c): float('inf') for r in range(MAZE_HEIGHT) for c in range(MAZE_WIDTH)}
+        g_score = {(r, c): float('inf') for r in range(self.maze.height) for c in range(self.maze.width)}
+        f_score = {(r, c): float('inf') for r in range(self.maze.height) for c in range(self.maze.width)}
         
         g_score[start] = 0
         f_score[start] = self._heuristic(start, end)
@@ -66,6 +109,16 @@ class PathFinder:
         path.append(self.maze.start)
         return path[::-1]
     
+    def _build_segments(self):
+        """Split the path into straight runs"""
+        self.segments = []
+        for i in range(1, len(self.path)):
+            direction = [self.path[i][0] - self.path[i-1][0], self.path[i][1] - self.path[i-1][1]]
+            if self.segments and self.segments[-1]["direction"] == direction:
+                self.segments[-1]["end"] = i
+            else:
+                self.segments.append({"start": i-1, "end": i, "direction": direction})
+
     def _detect_turn_directions(self):
         """Turn point detection algorithm"""
         self.turn_points = []
@@ -73,33 +126,19 @@ class PathFinder:
             return
         
         for i in range(1, len(self.path)-1):
-            prev = self.path[i-1]
             current = self.path[i]
-            next_ = self.path[i+1]
-            
-            # Calculate direction vectors (grid coordinates)
-            vec_in = (prev[1] - current[1], current[0] - prev[0])    # Rotated 90° for screen coordinates
-            vec_out = (next_[1] - current[1], current[0] - next_[0]) 
-            
-            # Skip straight movements
-            if vec_in[0]*vec_out[1] == vec_in[1]*vec_out[0]:  # Check colinearity
+            turn = turn_direction(self.path[i-1], current, self.path[i+1])
+            if turn is None:
                 continue
-                
-            # Calculate angles (considering screen Y-axis points downward)
-            angle_in = atan2(-vec_in[1], vec_in[0])  # Invert Y component
-            angle_out = atan2(-vec_out[1], vec_out[0])
-            diff = (angle_out - angle_in + pi) % (2*pi) - pi
-            
-            # Valid turn condition: angle change > 10 degrees
-            if abs(degrees(diff)) > 10:
-                # Determine turn direction
-                direction = "Left" if diff > 0 else "Right"  # Adjusted for coordinate rotation
-                screen_x = CELL_SIZE * (current[1] + 0.5)
-                screen_y = CELL_SIZE * (current[0] + 0.5)
-                
-                self.turn_points.append({
-                    "grid_pos": current,
-                    "screen_pos": (screen_x, screen_y),
-                    "direction": direction,
-                    "angle_diff": abs(degrees(diff))
-                })
\ No newline at end of file
+
+            direction, angle = turn
+            cell_size = self.config.cell_size
+            screen_x = cell_size * (current[1] + 0.5)
+            screen_y = cell_size * (current[0] + 0.5)
+
+            self.turn_points.append({
+                "grid_pos": current,
+                "screen_pos": (screen_x, screen_y),
+                "direction": direction,
+                "angle_diff": angle
+            })
@@ -3,7 +3,7 @@ import numpy as np
 import time
 from collections import deque
 from HIMUServer import HIMUServer
-import scipy.stats
+from himu_batch import parse_sensor_batch
 # *****************
 import socket
 import json
@@ -21,7 +21,11 @@ class KalmanFilterHeading:
 
     def predict(self, wy, wz, phi, theta, dt):
         """ Predict the new heading using the gyroscope. """
-        self.x += (wy * np.sin(phi) / np.cos(theta) + wz * np.cos(phi) / np.cos(theta)) * dt  
+        self.predict_rate((wy * np.sin(phi) + wz * np.cos(phi)) / np.cos(theta), dt)
+
+    def predict_rate(self, yaw_rate, dt):
+        """ Predict with a heading rate already computed for the whole batch (himu_batch.py). """
+        self.x += yaw_rate * dt
         self.P += self.Q  # Update error covariance
 
     def update(self, mag_heading, ori_yaw, alpha):
@@ -49,6 +53,7 @@ class MyCustomListener:
         self.time_data = deque(maxlen=max_points)   # Stores time in seconds
         self.start_time = time.time()  # Get initial timestamp
         self.initialized = False  # Flag to check if initial heading is set
+        self.last_batch_time = None  # Arrival time of the previous batch (seconds since start_time)
 
         # Step detection variables
         self.opt_list = [(-80, 0)]  # Store (value, timestamp) pairs
@@ -110,36 +115,24 @@ class MyCustomListener:
 
 
     def notify(self, sensorData):
-        for sensors in sensorData:
-            if len(sensors) < 4:
-                continue  
-            
-            ori = HIMUServer.strings2Floats(sensors[3]) if len(sensors) > 3 else [None, None, None, None]
-            gyr = HIMUServer.strings2Floats(sensors[2]) if len(sensors) > 2 else [None, None, None]
-            mag = HIMUServer.strings2Floats(sensors[0]) if len(sensors) > 0 else [None, None, None]
-
-            if ori is None or len(ori) < 3 or gyr is None or len(gyr) < 3 or mag is None or len(mag) < 3:
-                continue  # Skip if data is incomplete
-
-            pitch = -ori[1]  
-            
-            # Extract gyroscope readings
-            wx, wy, wz = gyr
-
-            # Extract orientation sensor values
-            theta = -ori[1]  # Pitch
-            phi = -ori[2]  # Roll
-            ori_yaw = ori[0]  # Yaw (raw orientation sensor)
-
-            # Extract magnetometer readings
-            mag_x, mag_y = mag[0], mag[1]
-            # Compute magnetometer-based heading
-            mag_heading = np.arctan2(mag_y, mag_x) * (180 / np.pi)   # Convert to degrees            
-
-            # Get time elapsed in seconds
-            current_time = time.time() - self.start_time
-            dt = 0.1
+        # Parse the whole batch at once; angles and gyro heading rate come out vectorised
+        frames = parse_sensor_batch(sensorData)
+        if len(frames) == 0:
+            return
 
+        # Samples of one batch arrived together: spread them evenly between the previous batch's
+        # arrival and this one (the first batch assumes the nominal 0.1 s sampling period)
+        now = time.time() - self.start_time
+        previous = self.last_batch_time if self.last_batch_time is not None else now - 0.1 * len(frames)
+        self.last_batch_time = now
+        times = np.linspace(previous, now, len(frames) + 1)[1:].tolist()
+        dt = 0.1  # nominal sampling period, as assumed by detect_step
+        pitches = frames['pitch'].tolist()
+        yaw_rates = frames['yaw_rate'].tolist()
+        mag_headings = frames['mag_heading'].tolist()
+        ori_yaws = frames['ori'][:, 0].tolist()
+
+        for pitch, yaw_rate, mag_heading, ori_yaw, current_time in zip(pitches, yaw_rates, mag_headings, ori_yaws, times):
             # Set the initial heading from the orientation sensor
             if not self.initialized:
                 self.kf = KalmanFilterHeading(initial_heading = ori_yaw)
@@ -155,7 +148,7 @@ class MyCustomListener:
             self.detect_step(pitch, current_time)
 
             # Kalman filter prediction (using gyro)
-            self.kf.predict(wy, wz, phi, theta, dt)
+            self.kf.predict_rate(yaw_rate, dt)
 
             # Kalman filter update (using magnetometer & orientation sensor)
             self.kf.update(mag_heading, ori_yaw, 0.9)
@@ -164,8 +157,8 @@ class MyCustomListener:
             self.heading = self.kf.get_heading()
             self.heading_list.append(self.heading)
                         
-            # Update the live plot
-            self.update_plot()
+        # Update the live plot once per batch
+        self.update_plot()
 
     def detect_step(self, pitch, current_time):
         """ Detects steps based on pitch maxima and minima with threshold """
@@ -220,6 +213,7 @@ class MyCustomListener:
 
                 # Compute mean heading from the start of the step (peak) to the end (trough)
                 heading_window = self.heading_list[-int(time_diff / 0.1):]  # Select headings during step
+                import scipy.stats  # only needed once the first step is detected
                 mean_heading = scipy.stats.circmean(heading_window, high=180, low=-180) if len(heading_window) > 0 else self.step_heading_start
 
                 # Compute new x, y position
@@ -0,0 +1,143 @@
+# ------ HCARD Group 1 ------
+import csv
+import time
+from Constants import *
+
+
+class FrameProfiler:
+    """Per-phase frame timing with fixed-size histograms (numpy and the buffers are set up when first enabled)"""
+    PHASES = ('events', 'core', 'maze', 'markers', 'path', 'agent', 'panel', 'flip', 'tick')
+
+    def __init__(self, enabled=PROFILER_ENABLED, history=PROFILER_HISTORY):
+        self.enabled = enabled
+        self.history = history
+        self.show_overlay = enabled
+        # One row per frame, one column per phase (milliseconds), used as a ring buffer
+        self.samples = None
+        self.frame_times = None
+        self.alert_latency = None  # IMU sample -> turn alert (ms)
+        self.frame_count = 0
+        self.alert_count = 0
+        self._phase_index = {name: i for i, name in enumerate(self.PHASES)}
+        self._row = 0
+        self._frame_start = 0.0
+        self._lap_start = 0.0
+        self._last_sample_time = None
+        self._toggle_pending = False
+
+    def toggle(self):
+        """Toggle recording and the on-screen overlay together, from the next start_frame() on"""
+        self._toggle_pending = not self._toggle_pending
+
+    def start_frame(self):
+        """Mark the beginning of a frame"""
+        if self._toggle_pending:
+            # Switching inside a frame would time the first laps from stale timestamps
+            self._toggle_pending = False
+            self.enabled = not self.enabled
+            self.show_overlay = self.enabled
+            self._last_sample_time = None
+        if not self.enabled:
+            return
+        if self.samples is None:
+            import numpy as np
+            self.samples = np.full((self.history, len(self.PHASES)), np.nan)
+            self.frame_times = np.full(self.history, np.nan)
+            self.alert_latency = np.full(self.history, np.nan)
+        self._row = self.frame_count % self.history
+        self.samples[self._row] = float('nan')
+        self._frame_start = self._lap_start = time.perf_counter()
+
+    def lap(self, phase):
+        """Record the time spent since the previous lap under the given phase"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.samples[self._row, self._phase_index[phase]] = (now - self._lap_start) * 1000
+        self._lap_start = now
+
+    def end_frame(self):
+        """Close the current frame"""
+        if not self.enabled:
+            return
+        self.frame_times[self._row] = (time.perf_counter() - self._frame_start) * 1000
+        self.frame_count += 1
+
+    def imu_sample(self):
+        """Remember the arrival time of the latest IMU sample"""
+        if not self.enabled:
+            return
+        self._last_sample_time = time.perf_counter()
+
+    def alert_fired(self):
+        """Record the latency between the latest IMU sample and a turn alert"""
+        if not self.enabled or self._last_sample_time is None:
+            return
+        latency = (time.perf_counter() - self._last_sample_time) * 1000
+        self.alert_latency[self.alert_count % self.history] = latency
+        self.alert_count += 1
+
+    def percentiles(self, phase):
+        """Return (p50, p95, p99) in milliseconds for a phase, 'frame' or 'alert'"""
+        import numpy as np
+        if self.samples is None:
+            return (0.0, 0.0, 0.0)
+        if phase == 'frame':
+            values = self.frame_times
+        elif phase == 'alert':
+            values = self.alert_latency
+        else:
+            values = self.samples[:, self._phase_index[phase]]
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return (0.0, 0.0, 0.0)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return (float(p50), float(p95), float(p99))
+
+    def summary(self):
+        """Percentiles of every phase plus the whole frame and alert latency"""
+        return {name: self.percentiles(name) for name in self.PHASES + ('frame', 'alert')}
+
+    def export(self, path=PROFILER_EXPORT_FILE):
+        """Write the recorded samples (oldest first) to a CSV file"""
+        count = min(self.frame_count, self.history)
+        start = self.frame_count - count
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('frame',) + self.PHASES + ('frame_total',))
+            for frame in range(start, self.frame_count):
+                row = frame % self.history
+                writer.writerow([frame] + [f"{v:.4f}" for v in self.samples[row]] +
+                                [f"{self.frame_times[row]:.4f}"])
+            writer.writerow([])
+            writer.writerow(('alert', 'latency_ms'))
+            count = min(self.alert_count, self.history)
+            for alert in range(self.alert_count - count, self.alert_count):
+                writer.writerow([alert, f"{self.alert_latency[alert % self.history]:.4f}"])
+
+    def draw_overlay(self, surface, rect):
+        """Draw the p50/p95/p99 table over the given rectangle"""
+        import pygame
+        if not self.show_overlay:
+            return
+
+        overlay = pygame.Surface(rect.size, pygame.SRCALPHA)
+        overlay.fill((255, 255, 255, 220))
+        surface.blit(overlay, rect.topleft)
+        pygame.draw.rect(surface, COLORS['table_border'], rect, 1)
+
+        font = pygame.font.SysFont('Arial', 12)
+        rows = self.summary()
+        row_height = 14
+        per_column = (rect.height - 8) // row_height - 1
+        column_width = rect.width // 2
+        for i, (name, (p50, p95, p99)) in enumerate(rows.items()):
+            column, line = divmod(i, per_column)
+            x = rect.x + 6 + column * column_width
+            y = rect.y + 4 + (line + 1) * row_height
+            text = font.render(f"{name:<8} {p50:6.2f} {p95:6.2f} {p99:6.2f}", True, COLORS['text'])
+            surface.blit(text, (x, y))
+        header = font.render("phase     p50    p95    p99 (ms)", True, COLORS['text'])
+        surface.blit(header, (rect.x + 6, rect.y + 4))
+        if len(rows) > per_column:
+            surface.blit(header, (rect.x + 6 + column_width, rect.y + 4))
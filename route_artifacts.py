@@ -0,0 +1,66 @@
+# ------ HCARD Group 1 ------
+import hashlib
+import json
+import os
+
+ROUTE_ARTIFACT_VERSION = 1
+
+
+def artifact_path(maze_file, kind):
+    """Artifacts live next to the maze: maze_simple.json -> maze_simple.<kind>.json"""
+    root, _ = os.path.splitext(maze_file)
+    return f"{root}.{kind}.json"
+
+
+def maze_file_hash(maze_file, *settings):
+    """Hash of the maze file plus any settings an artifact depends on"""
+    digest = hashlib.sha256()
+    with open(maze_file, 'rb') as f:
+        digest.update(f.read())
+    digest.update(json.dumps(list(settings)).encode())
+    return digest.hexdigest()
+
+
+def route_artifact_path(maze_file, planner="astar"):
+    """maze.route.json for A*, maze.<planner>.route.json for the other planners"""
+    return artifact_path(maze_file, "route" if planner == "astar" else f"{planner}.route")
+
+
+def route_hash(maze_file, config):
+    """Hash of the maze file and every setting the precomputed route depends on"""
+    return maze_file_hash(maze_file, ROUTE_ARTIFACT_VERSION, config.cell_size,
+                          config.path_interpolation_step, config.planner)
+
+
+def load_route(config):
+    """Return the stored route for config.maze_file, or None if missing or stale"""
+    path = route_artifact_path(config.maze_file, config.planner)
+    if not os.path.exists(path) or not os.path.exists(config.maze_file):
+        return None
+    try:
+        with open(path, 'r') as f:
+            route = json.load(f)
+    except Exception as e:
+        print(f"Error loading route artifact: {str(e)}")
+        return None
+    if route.get("hash") != route_hash(config.maze_file, config):
+        return None
+    return route
+
+
+def save_route(config, pathfinder, imu):
+    """Store path, segments, turn points and interpolated trajectory next to the maze file"""
+    if not os.path.exists(config.maze_file) or not pathfinder.path:
+        return  # nothing to key it on, or no route to cache
+    route = {
+        "hash": route_hash(config.maze_file, config),
+        "path": pathfinder.path,
+        "segments": pathfinder.segments,
+        "turn_points": pathfinder.turn_points,
+        "interpolated_path": [(round(x, 4), round(y, 4)) for x, y in imu.interpolated_path],
+    }
+    try:
+        with open(route_artifact_path(config.maze_file, config.planner), 'w') as f:
+            json.dump(route, f)
+    except OSError as e:
+        print(f"Error saving route artifact: {str(e)}")
@@ -0,0 +1,262 @@
+# ------ HCARD Group 1 ------
+import time
+from math import atan2, degrees, sqrt, pi
+from maze import MazeGenerator
+from pathfinder import PathFinder
+from imu import IMUSimulator
+from agent import Agent
+from config import SimulationConfig
+from route_artifacts import load_route, save_route
+from Constants import *
+
+
+class Simulation:
+    """Tracking core for one maze: IMU ingestion, agent update and turn alerts"""
+    def __init__(self, config=None, maze=None):
+        self.config = config or SimulationConfig()
+        self.maze = maze or MazeGenerator(self.config)
+        # Artifacts are keyed on config.maze_file, so they only apply to the maze loaded from it
+        use_artifacts = self.config.use_route_artifacts and maze is None
+        route = load_route(self.config) if use_artifacts else None
+        self.pathfinder = PathFinder(self.maze, self.config, route=route)
+        self.imu = IMUSimulator(self.pathfinder.path, self.config,
+                                interpolated_path=route["interpolated_path"] if route else None)
+        if route is None and use_artifacts:
+            save_route(self.config, self.pathfinder, self.imu)
+        self.agent = Agent(self.config)
+        self.turn_points = self.pathfinder.turn_points
+        self.next_turn_index = 0  # Index of next turn point to check
+        self.route_index = {cell: i for i, cell in enumerate(self.pathfinder.path)}
+        self.flow_field = None  # FlowField, built the first time the agent leaves the route
+        self.off_route = False
+        self.last_flow_turn_cell = None  # avoids repeating an off-route alert for the same turn
+        self.wall_detector = None  # WallCrossingDetector, created with the first sample
+        self.wall_crossings = []  # Samples whose move passed through a wall (drift analytics)
+        self.alert_distance = self.config.alert_distance
+        self.direction_alingnment = self.config.direction_alignment
+        self.current_turn_alert = None
+        self.turn_alert_start_time = 0
+        self.sample_listeners = []  # Called with each IMU sample as it arrives
+        self.alert_listeners = []  # Called with (direction, distance) whenever an alert fires
+        self.last_sample = None  # Latest IMU sample received by step()
+        self.last_sample_time = None  # perf_counter() when it was received, for alert latency accounting
+
+    def step(self, current_time, simulated=True):
+        """Ingest the pending IMU reading(s), move the agent and check for turns after each one"""
+        if simulated:
+            samples = [(self.imu.get_simulated_imu(current_time), time.perf_counter())]
+        else:
+            # Drain every datagram that arrived since the last frame so no alert waits a frame,
+            # keeping the time each one was received (not when it is processed) for latency accounting
+            samples = [(self.imu.get_real_imu_data(), self.imu.last_receive_time)]
+            while samples[-1][0] and len(samples) < MAX_SAMPLES_PER_STEP:
+                samples.append((self.imu.get_real_imu_data(timeout=0), self.imu.last_receive_time))
+            if len(samples) > 1 and samples[-1][0] is None:
+                samples.pop()
+
+        alert = None
+        for imu_data, receive_time in samples:
+            self.last_sample = imu_data
+            if imu_data:
+                self.last_sample_time = receive_time
+                imu_data = self._check_wall_crossing(imu_data, current_time)
+                for listener in self.sample_listeners:
+                    listener(imu_data)
+            self.agent.update(imu_data)
+            alert = self.check_upcoming_turn(current_time) or alert
+        return alert
+
+    def _check_wall_crossing(self, imu_data, current_time):
+        """Record a crossing if the move from the last position passes through a wall
+
+        With config.wall_crossing_correction the sample is pulled back to just before the wall.
+        """
+        if self.agent.last_valid_data is None:
+            return imu_data  # nothing to compare with yet
+        if self.wall_detector is None:
+            from wall_crossing import WallCrossingDetector
+            self.wall_detector = WallCrossingDetector(self.maze, self.config.cell_size)
+        start = self.agent.current_pos
+        events = self.wall_detector.check_segments([start], [imu_data[:2]], first_only=True)
+        if not len(events):
+            return imu_data
+
+        event = events[0]
+        self.wall_crossings.append({
+            "time": current_time,
+            "cell": (int(event['row']), int(event['col'])),
+            "side": str(event['side']),
+            "from": start,
+            "to": (imu_data[0], imu_data[1]),
+        })
+        if not self.config.wall_crossing_correction:
+            return imu_data
+        t = max(float(event['t']) - 0.01, 0.0)
+        return (start[0] + t * (imu_data[0] - start[0]),
+                start[1] + t * (imu_data[1] - start[1]),
+                imu_data[2])
+
+    def run_headless(self, dt=None):
+        """Consume every simulated IMU sample on a virtual clock, without any rendering"""
+        dt = dt or self.config.imu_interval
+        current_time = 0
+        while not self.finished:
+            current_time += dt
+            self.step(current_time)
+        return current_time
+
+    @property
+    def finished(self):
+        """True once the simulated IMU has produced all of its samples"""
+        return self.imu.current_step >= min(len(self.imu.interpolated_path),
+                                            self.config.max_imu_samples)
+
+    def check_upcoming_turn(self, current_time):
+        """Check proximity to next turn point, returns the new alert or None"""
+        cell = self._agent_cell()
+        if cell not in self.route_index:
+            # Off the planned route: the flow field gives the next turn from any cell
+            self.off_route = True
+            return self._check_flow_field_turn(cell, current_time)
+        if self.off_route:
+            # Back on the route, skip the turns up to the joining cell (the flow field covered those)
+            self.off_route = False
+            while self.next_turn_index < len(self.turn_points) and \
+                    self.route_index[self.turn_points[self.next_turn_index]["grid_pos"]] <= self.route_index[cell]:
+                self.next_turn_index += 1
+            if self.next_turn_index < len(self.turn_points) and \
+                    self.turn_points[self.next_turn_index]["grid_pos"] == self.last_flow_turn_cell:
+                self.next_turn_index += 1  # already announced through the flow field
+
+        if self.next_turn_index >= len(self.turn_points):
+            return None
+
+        turn_info = self.turn_points[self.next_turn_index]
+        distance = self._alert_distance_to(turn_info["screen_pos"])
+        if distance is not None:
+            self.next_turn_index += 1
+            return self._fire_alert(turn_info["direction"], distance, current_time, turn_info["grid_pos"])
+        return None
+
+    def _check_flow_field_turn(self, cell, current_time):
+        """Alert decision for off-route positions by array lookup, no replanning"""
+        if self.flow_field is None:
+            from flow_field import FlowField
+            self.flow_field = FlowField(self.maze)  # computed once per maze, on first use
+        guidance = self.flow_field.lookup(cell)
+        turn_cell = guidance["turn_cell"]
+        if turn_cell is None or turn_cell == self.last_flow_turn_cell:
+            return None
+        cell_size = self.config.cell_size
+        distance = self._alert_distance_to((cell_size*(turn_cell[1]+0.5), cell_size*(turn_cell[0]+0.5)))
+        if distance is not None:
+            self.last_flow_turn_cell = turn_cell
+            return self._fire_alert(guidance["turn_direction"], distance, current_time, turn_cell)
+        return None
+
+    def _agent_cell(self):
+        x, y = self.agent.current_pos
+        cell_size = self.config.cell_size
+        return (min(max(int(y // cell_size), 0), self.maze.height - 1),
+                min(max(int(x // cell_size), 0), self.maze.width - 1))
+
+    def _alert_distance_to(self, turn_pos):
+        """Distance to a turn if it is close enough and ahead of the agent, otherwise None"""
+        turn_x, turn_y = turn_pos
+        agent_x, agent_y = self.agent.current_pos
+        dx = turn_x - agent_x
+        dy = turn_y - agent_y
+        distance = sqrt(dx**2 + dy**2)
+
+        if distance <= self.alert_distance:
+            path_angle = atan2(dy, dx)
+            agent_angle = self.agent.current_heading
+            angle_diff = degrees((path_angle - agent_angle + pi) % (2*pi) - pi)
+
+            if abs(angle_diff) < self.direction_alingnment:  # Direction alignment threshold
+                return distance
+        return None
+
+    def _fire_alert(self, direction, distance, current_time, turn=None):
+        self.current_turn_alert = {
+            "direction": direction,
+            "distance": distance,
+            "turn": turn  # (row, col) of the announced turn, identifies it for haptic coalescing
+        }
+        self.turn_alert_start_time = current_time
+        for listener in self.alert_listeners:
+            listener(direction, distance)
+        return self.current_turn_alert
+
+    def announce_alert(self, direction, distance, current_time, turn=None):
+        """Show an alert decided elsewhere (e.g. by the core process) and notify the alert listeners"""
+        return self._fire_alert(direction, distance, current_time, turn)
+
+    def expire_alert(self, current_time, duration=2000):
+        """Clear the current alert once it has been shown for `duration` ms"""
+        if self.current_turn_alert and current_time - self.turn_alert_start_time > duration:
+            self.current_turn_alert = None
+        return self.current_turn_alert
+
+    def snapshot(self, current_time, include_trail=True):
+        """JSON-serialisable copy of the mutable run state (the maze and route are rebuilt from config)
+
+        Without include_trail only the lengths of the agent trail and wall crossing log are
+        stored; both are append-only, so a longer copy of them can restore the prefix (see checkpoints.py).
+        """
+        imu, agent = self.imu, self.agent
+        state = {
+            "time": current_time,
+            "imu": {
+                "current_step": imu.current_step,
+                "last_update_time": imu.last_update_time,
+                "history": [list(h) for h in imu.history],
+                "rng": imu._rng.bit_generator.state if imu._rng is not None else None,
+            },
+            "agent": {
+                "current_pos": list(agent.current_pos),
+                "current_heading": agent.current_heading,
+                "last_valid_data": list(agent.last_valid_data) if agent.last_valid_data else None,
+                "trail_length": len(agent.trail),
+            },
+            "next_turn_index": self.next_turn_index,
+            "current_turn_alert": dict(self.current_turn_alert) if self.current_turn_alert else None,
+            "turn_alert_start_time": self.turn_alert_start_time,
+            "off_route": self.off_route,
+            "last_flow_turn_cell": list(self.last_flow_turn_cell) if self.last_flow_turn_cell else None,
+            "last_sample": list(self.last_sample) if self.last_sample else None,
+            "wall_crossing_count": len(self.wall_crossings),
+        }
+        if include_trail:
+            state["agent"]["trail"] = [list(p) for p in agent.trail]
+            state["wall_crossings"] = [dict(c) for c in self.wall_crossings]
+        return state
+
+    def restore(self, state, trail=None, wall_crossings=None):
+        """Load a snapshot(); trail / wall_crossings supply the prefixes when the snapshot has none"""
+        imu, agent = self.imu, self.agent
+        imu.current_step = state["imu"]["current_step"]
+        imu.last_update_time = state["imu"]["last_update_time"]
+        imu.history = [tuple(h) for h in state["imu"]["history"]]
+        if state["imu"]["rng"] is None:
+            imu._rng = None
+        else:
+            imu.rng.bit_generator.state = state["imu"]["rng"]
+
+        agent_state = state["agent"]
+        agent.current_pos = tuple(agent_state["current_pos"])
+        agent.current_heading = agent_state["current_heading"]
+        agent.last_valid_data = tuple(agent_state["last_valid_data"]) if agent_state["last_valid_data"] else None
+        trail = agent_state.get("trail", trail)
+        agent.set_trail(trail[:agent_state["trail_length"]])
+        crossings = state.get("wall_crossings", wall_crossings) or []
+        self.wall_crossings = [{key: tuple(value) if isinstance(value, list) else value  # lists after JSON
+                                for key, value in c.items()} for c in crossings[:state["wall_crossing_count"]]]
+
+        self.next_turn_index = state["next_turn_index"]
+        alert = state["current_turn_alert"]
+        self.current_turn_alert = dict(alert, turn=tuple(alert["turn"]) if alert.get("turn") else None) if alert else None
+        self.turn_alert_start_time = state["turn_alert_start_time"]
+        self.off_route = state["off_route"]
+        self.last_flow_turn_cell = tuple(state["last_flow_turn_cell"]) if state["last_flow_turn_cell"] else None
+        self.last_sample = tuple(state["last_sample"]) if state["last_sample"] else None
@@ -0,0 +1,100 @@
+# ------ HCARD Group 1 ------
+import numpy as np
+from maze import WALL_BITS
+from Constants import *
+
+CROSSING_DTYPE = np.dtype([
+    ('segment', np.int64),  # index of the segment in the batch
+    ('t', np.float64),      # fraction along the segment where the wall is hit
+    ('row', np.int32),      # cell the walker leaves
+    ('col', np.int32),
+    ('side', 'U6'),         # wall side of that cell: top/bottom/left/right
+])
+
+
+class WallCrossingDetector:
+    """Vectorised segment-versus-wall test (grid DDA over the wall bitmask)
+
+    Positions are screen pixels as used by Agent; every grid line a segment crosses is
+    visited in one batch of array operations and checked against the wall bits of the
+    cell being left, including the maze's outer boundary.
+    """
+    def __init__(self, maze, cell_size):
+        self.mask = maze.to_bitmask()
+        self.height, self.width = self.mask.shape
+        self.cell_size = cell_size
+
+    def check_segments(self, starts, ends, first_only=False):
+        """Return a CROSSING_DTYPE array of every wall crossed by the segments starts[i] -> ends[i]"""
+        p0 = np.asarray(starts, dtype=np.float64).reshape(-1, 2) / self.cell_size
+        p1 = np.asarray(ends, dtype=np.float64).reshape(-1, 2) / self.cell_size
+        events = [
+            self._crossings(p0[:, 0], p1[:, 0], p0[:, 1], p1[:, 1], vertical=True),
+            self._crossings(p0[:, 1], p1[:, 1], p0[:, 0], p1[:, 0], vertical=False),
+        ]
+        events = np.concatenate(events)
+        events = events[np.lexsort((events['t'], events['segment']))]
+        if first_only and len(events):
+            keep = np.ones(len(events), dtype=bool)
+            keep[1:] = events['segment'][1:] != events['segment'][:-1]
+            events = events[keep]
+        return events
+
+    def check_trail(self, trail, first_only=False):
+        """Check every consecutive pair of a recorded trail (segment i = trail[i] -> trail[i+1])"""
+        points = np.asarray(trail, dtype=np.float64).reshape(-1, 2)
+        if len(points) < 2:
+            return np.zeros(0, dtype=CROSSING_DTYPE)
+        return self.check_segments(points[:-1], points[1:], first_only)
+
+    def _crossings(self, a0, a1, b0, b1, vertical):
+        """Crossings of the grid lines perpendicular to axis a (a = x for vertical lines)"""
+        step = np.sign(a1 - a0).astype(np.int64)
+        first_line = np.where(step > 0, np.floor(a0) + 1, np.ceil(a0) - 1).astype(np.int64)
+        counts = np.where(step > 0, np.floor(a1) - np.floor(a0),
+                          np.ceil(a0) - np.ceil(a1)).astype(np.int64)
+        counts[step == 0] = 0
+        if not counts.any():
+            return np.zeros(0, dtype=CROSSING_DTYPE)
+
+        # (segments, crossings) grid of candidate lines, masked to each segment's own count
+        j = np.arange(counts.max())
+        valid = j[None, :] < counts[:, None]
+        lines = first_line[:, None] + step[:, None] * j[None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (lines - a0[:, None]) / (a1 - a0)[:, None]
+        b = np.floor(b0[:, None] + t * (b1 - b0)[:, None]).astype(np.int64)
+
+        # Leaving cell: the one before the line in the direction of travel
+        leaving = np.where(step[:, None] > 0, lines - 1, lines)
+        limit_a, limit_b = (self.width, self.height) if vertical else (self.height, self.width)
+        on_grid = valid & (b >= 0) & (b < limit_b)
+        inside = on_grid & (leaving >= 0) & (leaving < limit_a)
+        # Leaving from outside the maze through the boundary: test the cell being entered instead
+        entering = np.where(step[:, None] > 0, lines, lines - 1)
+        from_outside = on_grid & ~inside & (entering >= 0) & (entering < limit_a)
+
+        if vertical:
+            forward, backward = WALL_BITS['right'], WALL_BITS['left']
+        else:
+            forward, backward = WALL_BITS['bottom'], WALL_BITS['top']
+        forward_move = np.broadcast_to(step[:, None] > 0, lines.shape)
+        bits = np.where(forward_move, forward, backward)
+        enter_bits = np.where(forward_move, backward, forward)
+
+        seg_idx, cross_idx = np.nonzero(inside | from_outside)
+        use_leaving = inside[seg_idx, cross_idx]
+        cell_a = np.where(use_leaving, leaving[seg_idx, cross_idx], entering[seg_idx, cross_idx])
+        cell_b = b[seg_idx, cross_idx]
+        wall_bits = np.where(use_leaving, bits[seg_idx, cross_idx], enter_bits[seg_idx, cross_idx])
+        rows, cols = (cell_b, cell_a) if vertical else (cell_a, cell_b)
+        blocked = (self.mask[rows, cols] & wall_bits) > 0
+
+        events = np.zeros(int(blocked.sum()), dtype=CROSSING_DTYPE)
+        events['segment'] = seg_idx[blocked]
+        events['t'] = t[seg_idx, cross_idx][blocked]
+        events['row'] = rows[blocked]
+        events['col'] = cols[blocked]
+        sides = {WALL_BITS[s]: s for s in WALL_BITS}
+        events['side'] = [sides[int(v)] for v in wall_bits[blocked]]
+        return events